@@ -1,48 +1,244 @@
 import pygame
 from pygame.locals import *
-from scripts.physics import update_physics, FPS, TIME_MULTIPLIER
-from scripts.camera import Camera, handle_camera_input, handle_locked_camera_input, handle_planetary_input, check_hover
+from scripts.physics import advance_physics, pack_bodies, TrailBuffer, GPUIntegrator, DT, FPS, TIME_MULTIPLIER, WARP_AVAILABLE
+from scripts.camera import Camera, handle_camera_input, handle_locked_camera_input, handle_planetary_input, hover_index
 from scripts.visuals import render_scene
 from scripts.system_loader import load_solar_system, save_solar_system
 import numpy as np
 import argparse
-import tkinter as tk
-from tkinter import simpledialog, messagebox
 import os
+import multiprocessing
+import queue
 
 # Screen dimensions
 WIDTH, HEIGHT = 1000, 800
 
+# Longest wall-clock frame fed to the physics (e.g. after a blocking dialog)
+MAX_FRAME_TIME = 0.25
 
-def save_current_system(bodies):
-    """Save current system state with user input dialog"""
+# Frame rate while the window is minimized (nothing is drawn, so there's no need to spin)
+IDLE_FPS = 10
+
+# Save dialogs run in child processes so Tk owns their main thread; spawn avoids forking pygame's state
+DIALOGS = multiprocessing.get_context("spawn")
+
+
+def ask_save_filename(results):
+    """Ask the user for a filename and put it on the results queue (runs in a dialog process)"""
+    # Imported here so tkinter is only loaded once the user actually saves
+    import tkinter as tk
+    from tkinter import simpledialog
+    
+    filename = None
+    try:
+        # Create root window (hidden)
+        root = tk.Tk()
+        root.withdraw()
+        
+        # Get filename from user
+        filename = simpledialog.askstring(
+            "Save System", 
+            "Enter filename (without extension):",
+            parent=root
+        )
+        
+        root.destroy()
+    finally:
+        # Always answer, so the main loop doesn't wait on a dialog that failed to open
+        results.put(filename)
+
+
+def show_save_message(title, message, error=False):
+    """Show a save confirmation or error box (runs in a dialog process)"""
+    import tkinter as tk
+    from tkinter import messagebox
     
-    # Create root window (hidden)
     root = tk.Tk()
     root.withdraw()
+    if error:
+        messagebox.showerror(title, message, parent=root)
+    else:
+        messagebox.showinfo(title, message, parent=root)
+    root.destroy()
+
+
+def save_current_system(bodies, filename):
+    """Save current system state under the filename chosen in the save dialog"""
+    # Ensure .json extension
+    if not filename.endswith('.json'):
+        filename += '.json'
     
-    # Get filename from user
-    filename = simpledialog.askstring(
-        "Save System", 
-        "Enter filename (without extension):",
-        parent=root
-    )
+    # Save to systems folder
+    filepath = os.path.join('systems', filename)
     
-    if filename:
-        # Ensure .json extension
-        if not filename.endswith('.json'):
-            filename += '.json'
+    try:
+        save_solar_system(bodies, filepath)
+        args = ("Success", f"System saved to {filepath}")
+    except Exception as e:
+        args = ("Error", f"Failed to save system: {e}", True)
+    DIALOGS.Process(target=show_save_message, args=args).start()
+
+
+class SimulationState:
+    """Mutable state of a running simulation, shared by the key handlers and the main loop"""
+    
+    def __init__(self, system_path, width, height, use_gpu=False):
+        self.system_path = system_path
+        self.use_gpu = use_gpu  # Integrate on a Warp device instead of the CPU
+        self.width, self.height = width, height  # Dynamic screen dimensions
+        self.mouse_pos = (0, 0)
+        
+        # Camera
+        self.camera = Camera()
         
-        # Save to systems folder
-        filepath = os.path.join('systems', filename)
+        # Game state
+        self.paused = False
+        self.show_trails = True
+        self.show_ui = True  # Toggle for UI instructions
+        self.time_multiplier = TIME_MULTIPLIER
+        self.movement_speed_multiplier = 1.0  # For adjustable camera movement speed
+        self.locked_index = None  # Index of the camera lock target
+        self.planetary_index = None  # Index of the planetary mode target
+        self.physics_time = 0.0  # Simulated time not yet integrated
+        self.visible = True  # False while the window is minimized or hidden
+        self.save_results = DIALOGS.Queue()  # Filenames returned by the save dialog process
+        self.save_pending = False  # A save dialog is currently open
+        self.running = True
         
-        try:
-            save_solar_system(bodies, filepath)
-            messagebox.showinfo("Success", f"System saved to {filepath}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save system: {e}")
+        self.load_system()
     
-    root.destroy()
+    def load_system(self):
+        """Load celestial bodies from file and pack their state for the physics"""
+        self.bodies = load_solar_system(self.system_path)
+        self.positions, self.velocities, self.masses = pack_bodies(self.bodies)
+        self.trails = TrailBuffer(self.positions)
+        self.render_positions = self.positions.astype(np.float32)  # Single-precision mirror for projection/hover
+        self.radii = np.array([body.radius for body in self.bodies])  # Packed radii for hover tests
+        self.gpu = GPUIntegrator(self.positions, self.velocities, self.masses) if self.use_gpu else None
+    
+    def hovered_index(self):
+        """Index of the body under the mouse cursor, or None"""
+        return hover_index(self.mouse_pos, self.render_positions, self.radii, self.camera, self.width, self.height)
+    
+    @property
+    def locked_body(self):
+        return self.bodies[self.locked_index] if self.locked_index is not None else None
+    
+    @property
+    def planetary_body(self):
+        return self.bodies[self.planetary_index] if self.planetary_index is not None else None
+
+
+def quit_simulation(state):
+    """Exit the simulation"""
+    state.running = False
+
+
+def toggle_pause(state):
+    """Pause/resume the simulation"""
+    state.paused = not state.paused
+
+
+def toggle_trails(state):
+    """Show/hide orbital trails"""
+    state.show_trails = not state.show_trails
+
+
+def toggle_ui(state):
+    """Show/hide UI instructions"""
+    state.show_ui = not state.show_ui
+
+
+def toggle_lock(state):
+    """Lock camera to hovered body or unlock"""
+    state.locked_index = state.hovered_index()
+    # Clear planetary mode when locking
+    state.planetary_index = None
+
+
+def toggle_planetary_mode(state):
+    """Planetary mode: fix distance to hovered body"""
+    state.planetary_index = state.hovered_index()
+    # Clear lock mode when entering planetary mode
+    state.locked_index = None
+    state.camera.reset_rotation()
+    if state.planetary_body:
+        # Position camera at north pole and set up orientation
+        state.camera.enter_planetary_mode(state.planetary_body)
+
+
+def save_system(state):
+    """Save current system state (the dialog runs in its own process so the simulation keeps going)"""
+    if state.save_pending:
+        return
+    state.save_pending = True
+    DIALOGS.Process(target=ask_save_filename, args=(state.save_results,)).start()
+
+
+def poll_save_dialog(state):
+    """Save the system once the dialog process has returned a filename"""
+    try:
+        filename = state.save_results.get_nowait()
+    except queue.Empty:
+        return
+    state.save_pending = False
+    if filename:
+        if state.gpu:
+            # Velocities live on the device; bring them back before writing the file
+            state.gpu.download_velocities(state.velocities)
+        save_current_system(state.bodies, filename)
+
+
+def reset_simulation(state):
+    """Reset simulation"""
+    state.load_system()
+    state.time_multiplier = TIME_MULTIPLIER
+    state.physics_time = 0.0
+    state.movement_speed_multiplier = 1.0
+    # Reset camera to default state
+    state.camera.reset_rotation()
+    state.camera.position = np.array([0.0, 0.0, -5e11])  # Default position
+    # Clear any active modes
+    state.locked_index = None
+    state.planetary_index = None
+
+
+def speed_up_time(state):
+    """Speed up time"""
+    state.time_multiplier = min(state.time_multiplier * 2, 100.0)
+
+
+def slow_down_time(state):
+    """Slow down time"""
+    state.time_multiplier = max(state.time_multiplier / 2, 0.01)
+
+
+def speed_up_movement(state):
+    """Faster movement speed"""
+    state.movement_speed_multiplier = min(state.movement_speed_multiplier * 1.5, 10.0)
+
+
+def slow_down_movement(state):
+    """Slower movement speed"""
+    state.movement_speed_multiplier = max(state.movement_speed_multiplier / 1.5, 0.1)
+
+
+# KEYDOWN dispatch table
+KEY_HANDLERS = {
+    K_ESCAPE: quit_simulation,
+    K_SPACE: toggle_pause,
+    K_t: toggle_trails,
+    K_c: toggle_ui,
+    K_l: toggle_lock,
+    K_p: toggle_planetary_mode,
+    K_RETURN: save_system,
+    K_r: reset_simulation,
+    K_PLUS: speed_up_time,
+    K_EQUALS: speed_up_time,
+    K_MINUS: slow_down_time,
+    K_PERIOD: speed_up_movement,
+    K_COMMA: slow_down_movement,
+}
 
 
 def main():
@@ -50,7 +246,13 @@ def main():
     parser = argparse.ArgumentParser(description='3D Gravity Simulation')
     parser.add_argument('--system', '-s', type=str, default='system.json',
                         help='Path to solar system configuration file (default: system.json)')
+    parser.add_argument('--busy-loop', action='store_true',
+                        help='Regulate frame rate with a busy loop for precise frame timing (uses more CPU)')
+    parser.add_argument('--gpu', action='store_true',
+                        help='Integrate the physics on the GPU with Warp (requires warp-lang)')
     args = parser.parse_args()
+    if args.gpu and not WARP_AVAILABLE:
+        parser.error('--gpu requires Warp (pip install warp-lang)')
     
     # Initialize Pygame
     pygame.init()
@@ -58,178 +260,107 @@ def main():
     pygame.display.set_caption("3D Gravity Simulation")
     clock = pygame.time.Clock()
     
-    # Dynamic screen dimensions
-    current_width, current_height = WIDTH, HEIGHT
-    
-    # Load celestial bodies from file
-    bodies = load_solar_system(args.system)
+    state = SimulationState(args.system, WIDTH, HEIGHT, args.gpu)
+    camera = state.camera
     
-    # Camera
-    camera = Camera()
+    # Scratch vector for the planetary body's per-frame displacement
+    planetary_movement = np.empty(3)
+    frame_time = 1.0 / FPS  # Wall-clock duration of the previous frame
     
-    # Game state
-    paused = False
-    show_trails = True
-    show_ui = True  # Toggle for UI instructions
-    time_multiplier = TIME_MULTIPLIER
-    movement_speed_multiplier = 1.0  # For adjustable camera movement speed
-    locked_body = None  # Camera lock target
-    planetary_body = None  # Planetary mode target
-    running = True
-    
-    while running:
+    while state.running:
+        # Sample mouse once per frame; hover checks and rendering share it
+        state.mouse_pos = pygame.mouse.get_pos()
+        
         # Handle events
         for event in pygame.event.get():
             if event.type == QUIT:
-                running = False
+                state.running = False
             elif event.type == VIDEORESIZE:
                 # Handle window resize
-                old_width, old_height = current_width, current_height
-                current_width, current_height = event.w, event.h
-                screen = pygame.display.set_mode((current_width, current_height), pygame.RESIZABLE)
+                state.width, state.height = event.w, event.h
+                screen = pygame.display.set_mode((state.width, state.height), pygame.RESIZABLE)
+            elif event.type in (WINDOWMINIMIZED, WINDOWHIDDEN):
+                state.visible = False
+            elif event.type in (WINDOWRESTORED, WINDOWMAXIMIZED, WINDOWSHOWN):
+                if not state.visible:
+                    # Trails weren't recorded while hidden; restart them rather than bridge the gap with a chord
+                    state.trails.reset(state.positions)
+                state.visible = True
             elif event.type == KEYDOWN:
-                if event.key == K_ESCAPE:
-                    running = False
-                elif event.key == K_SPACE:
-                    paused = not paused
-                elif event.key == K_t:
-                    show_trails = not show_trails
-                elif event.key == K_c:
-                    show_ui = not show_ui
-                elif event.key == K_l:
-                    # Lock camera to hovered body or unlock
-                    hovered_body = check_hover(pygame.mouse.get_pos(), bodies, camera, current_width, current_height)
-                    locked_body = hovered_body if hovered_body else None
-                    # Clear planetary mode when locking
-                    planetary_body = None
-                elif event.key == K_p:
-                    # Planetary mode: fix distance to hovered body
-                    hovered_body = check_hover(pygame.mouse.get_pos(), bodies, camera, current_width, current_height)
-                    planetary_body = hovered_body if hovered_body else None
-                    # Clear lock mode when entering planetary mode
-                    locked_body = None
-                    # Clear planetary attributes
-                    for attr in ['planetary_initial_forward', 'planetary_initial_anchor', 'planetary_initial_pitch', 'planetary_initial_yaw']:
-                        if hasattr(camera, attr):
-                            delattr(camera, attr)
-                    camera.reset_rotation()
-                    if not locked_body and planetary_body:
-                        # CRITICAL FIX: Position camera at north pole and set up orientation
-                        # North pole is at body.position + (0, radius + offset, 0) in world coordinates
-                        north_pole_offset = np.array([0.0, planetary_body.radius + 7e7, 0.0])
-                        camera.position = planetary_body.position + north_pole_offset
-                        
-                        # Set camera orientation directly for north pole view
-                        # At north pole: up points away from planet, forward points down, right points east
-                        planetary_up_vector = np.array([0.0, 1.0, 0.0])  # Up at north pole (world Y)
-                        camera.up = planetary_up_vector / np.linalg.norm(planetary_up_vector)  # Normalize
-                        camera.forward = -planetary_up_vector  # Look down toward planet center
-                        camera.forward = camera.forward / np.linalg.norm(camera.forward)  # Normalize
-                        
-                        # Calculate right vector to maintain orthogonal system (cross product order: up × forward)
-                        camera.right = np.cross(camera.up, camera.forward)
-                        if np.linalg.norm(camera.right) > 1e-6:
-                            camera.right = camera.right / np.linalg.norm(camera.right)
-                        else:
-                            # Fallback if cross product fails
-                            camera.right = np.array([1.0, 0.0, 0.0])
-                        
-                        # Initialize planetary coordinate system
-                        # planetary_up should point away from planet center (surface normal)
-                        radial_vector = camera.position - planetary_body.position
-                        if np.linalg.norm(radial_vector) > 0:
-                            camera.planetary_up = radial_vector / np.linalg.norm(radial_vector)
-                        else:
-                            camera.planetary_up = np.array([0.0, 1.0, 0.0])
-                        
-                        # planetary_right should be stable (east-west direction)
-                        # At north pole, east is along world X axis
-                        camera.planetary_right = np.array([1.0, 0.0, 0.0])
-                        
-                        # Clear any existing manual rotation
-                        if hasattr(camera, 'manual_rotation'):
-                            camera.manual_rotation = np.eye(3)
-                        else:
-                            camera.manual_rotation = np.eye(3)
-                elif event.key == K_RETURN:
-                    # Save current system state
-                    save_current_system(bodies)
-                elif event.key == K_r:
-                    # Reset simulation
-                    bodies = load_solar_system(args.system)
-                    time_multiplier = TIME_MULTIPLIER
-                    movement_speed_multiplier = 1.0
-                    # Reset camera to default state
-                    camera.reset_rotation()
-                    camera.position = np.array([0.0, 0.0, -5e11])  # Default position
-                    # Clear any active modes
-                    locked_body = None
-                    planetary_body = None
-                elif event.key == K_PLUS or event.key == K_EQUALS:
-                    # Speed up time
-                    time_multiplier = min(time_multiplier * 2, 100.0)
-                elif event.key == K_MINUS:
-                    # Slow down time
-                    time_multiplier = max(time_multiplier / 2, 0.01)
-                elif event.key == K_PERIOD:
-                    # Faster movement speed
-                    movement_speed_multiplier = min(movement_speed_multiplier * 1.5, 10.0)
-                elif event.key == K_COMMA:
-                    # Slower movement speed
-                    movement_speed_multiplier = max(movement_speed_multiplier / 1.5, 0.1)
+                handler = KEY_HANDLERS.get(event.key)
+                if handler:
+                    handler(state)
+        
+        # Finish a save once its dialog has closed
+        if state.save_pending:
+            poll_save_dialog(state)
+        
+        locked_index = state.locked_index
+        planetary_index = state.planetary_index
+        locked_body = state.locked_body
+        planetary_body = state.planetary_body
+        positions = state.positions
         
         # Handle continuous input
         keys = pygame.key.get_pressed()
         if locked_body:
             # When locked, only allow orbital movement (WASD) and zoom (QE)
-            handle_locked_camera_input(camera, keys, movement_speed_multiplier, locked_body)
+            handle_locked_camera_input(camera, keys, state.movement_speed_multiplier, locked_body)
         elif planetary_body:
             # Planetary mode: normal rotation + perpendicular movement
-            handle_planetary_input(camera, keys, movement_speed_multiplier, planetary_body)
+            handle_planetary_input(camera, keys, state.movement_speed_multiplier, planetary_body)
         else:
             # Normal camera controls when not locked
-            handle_camera_input(camera, keys, movement_speed_multiplier)
+            handle_camera_input(camera, keys, state.movement_speed_multiplier)
+        
+        # Store planetary body position before physics update
+        if planetary_index is not None:
+            np.copyto(planetary_movement, positions[planetary_index])
         
         # Update physics
-        if not paused:
-            # Store planetary body position before physics update
-            if planetary_body:
-                old_planetary_position = planetary_body.position.copy()
-            
-            update_physics(bodies, time_multiplier)
-            
-            # Apply planetary body movement to camera
-            if planetary_body:
-                planetary_movement = planetary_body.position - old_planetary_position
-                camera.position += planetary_movement
+        if not state.paused:
+            # One frame at the target FPS covers DT * time_multiplier of simulated time
+            state.physics_time += min(frame_time, MAX_FRAME_TIME) * FPS * DT * state.time_multiplier
+            # Trails are not recorded while nothing is drawn
+            trails = state.trails if state.visible else None
+            if state.gpu:
+                state.physics_time = state.gpu.advance(positions, trails, state.physics_time)
+            else:
+                state.physics_time = advance_physics(positions, state.velocities, state.masses, trails, state.physics_time)
+            np.copyto(state.render_positions, positions)
         
-        # Update camera lock
-        if locked_body:
-            # Calculate camera movement to follow locked body
-            if not hasattr(camera, 'lock_offset'):
+        # Move the camera with its target, reading the freshly integrated positions by index
+        if locked_index is not None:
+            if not camera.lock_active:
                 # Initialize lock offset when first locking
-                camera.lock_offset = camera.position - locked_body.position
-            
-            # Move camera with locked body
-            camera.position = locked_body.position + camera.lock_offset
-        elif planetary_body:
-            # Planetary mode: handle movement in handle_planetary_input
-            # Don't override camera position here - let handle_planetary_input manage it
-            pass
+                np.subtract(camera.position, positions[locked_index], out=camera.lock_offset)
+                camera.lock_active = True
+            np.add(positions[locked_index], camera.lock_offset, out=camera.position)
         else:
             # Clear lock offset when not locked
-            if hasattr(camera, 'lock_offset'):
-                delattr(camera, 'lock_offset')
-        
-        # Render
-        render_scene(screen, bodies, camera, show_trails, show_ui, time_multiplier, movement_speed_multiplier, current_width, current_height, locked_body, planetary_body)
+            camera.lock_active = False
+            if planetary_index is not None:
+                # Apply planetary body movement to camera (zero while paused)
+                np.subtract(positions[planetary_index], planetary_movement, out=planetary_movement)
+                camera.position += planetary_movement
         
-        # Update display
-        pygame.display.flip()
-        clock.tick(FPS)
+        # Render and update display (skipped entirely while the window can't be seen)
+        if state.visible:
+            if state.gpu and state.hovered_index() is not None:
+                # The hover panel shows velocities, which only live on the device
+                state.gpu.download_velocities(state.velocities)
+            render_scene(screen, state.bodies, camera, state.show_trails, state.show_ui, state.time_multiplier, state.movement_speed_multiplier, state.width, state.height, locked_body, planetary_body, state.mouse_pos, state.trails, state.render_positions, state.radii)
+            pygame.display.flip()
+        # Regulate frame rate, sleeping in the OS unless precise timing was requested
+        if not state.visible:
+            frame_time = clock.tick(IDLE_FPS) / 1000.0
+        elif args.busy_loop:
+            frame_time = clock.tick_busy_loop(FPS) / 1000.0
+        else:
+            frame_time = clock.tick(FPS) / 1000.0
     
     pygame.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
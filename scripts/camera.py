@@ -1,11 +1,61 @@
+import math
 import pygame
 import numpy as np
 from pygame.locals import *
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional; projection falls back to NumPy without it
+    NUMBA_AVAILABLE = False
+
+# World axes and identity, shared instead of rebuilt on every use (copy before storing)
+_WORLD_UP = np.array([0.0, 1.0, 0.0])
+_WORLD_RIGHT = np.array([1.0, 0.0, 0.0])
+_WORLD_FORWARD = np.array([0.0, 0.0, 1.0])
+_IDENTITY3 = np.eye(3)
+for _constant in (_WORLD_UP, _WORLD_RIGHT, _WORLD_FORWARD, _IDENTITY3):
+    # Read-only, so a caller that forgets to copy before mutating fails loudly
+    _constant.setflags(write=False)
+
+# Height above the surface at which planetary mode holds the camera
+PLANETARY_OFFSET = 7e7
+
+# Perspective projection settings
+FOV_FACTOR = 500.0  # Screen scale factor (adjust for zoom level)
+NEAR_CLAMP = 1e8  # Minimum camera depth used for the perspective divide
+
+# Rotations applied between re-orthonormalizations of the camera basis
+RENORMALIZE_INTERVAL = 64
+
+
+def _norm3(v):
+    """Length of a 3-vector, without np.linalg.norm's general-shape dispatch"""
+    x, y, z = v
+    return math.sqrt(x * x + y * y + z * z)
+
+
+def _normalize3(v):
+    """Unit vector along v (v itself if it has zero length)"""
+    n = _norm3(v)
+    return v / n if n > 0 else v
+
+
+def _cross(a, b):
+    """Cross product of two 3-vectors, without np.cross's general-shape dispatch"""
+    ax, ay, az = a
+    bx, by, bz = b
+    return np.array([ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx])
+
 
 class Camera:
     def __init__(self, position=None, forward=None, up=None):
         """Initialize camera with position and orientation vectors"""
+        # Orientation rows (right, up, forward) in one contiguous block; this is also the view basis
+        self._basis = np.empty((3, 3))
+        self._orientation_version = 0  # Bumped whenever an orientation vector is assigned
+        
         # Position
         if position is None:
             self.position = np.array([0.0, 0.0, -5e11])  # Default position
@@ -14,28 +64,76 @@ class Camera:
         
         # Orientation vectors (always normalized)
         if forward is None:
-            self.forward = np.array([0.0, 0.0, 1.0])  # Default forward (looking along +Z)
+            self.forward = _WORLD_FORWARD  # Default forward (looking along +Z)
         else:
-            self.forward = forward / np.linalg.norm(forward)
+            self.forward = _normalize3(forward)
         
         if up is None:
-            self.up = np.array([0.0, 1.0, 0.0])  # Default up (along +Y)
+            self.up = _WORLD_UP  # Default up (along +Y)
         else:
-            self.up = up / np.linalg.norm(up)
+            self.up = _normalize3(up)
         
         # Calculate right vector from forward and up (ensures orthogonality)
-        self.right = np.cross(self.up, self.forward)
-        if np.linalg.norm(self.right) > 0:
-            self.right = self.right / np.linalg.norm(self.right)
+        self.right = _cross(self.up, self.forward)
+        norm = _norm3(self.right)
+        if norm > 0:
+            self.right = self.right / norm
         else:
             # Fallback if forward and up are parallel
-            self.right = np.array([1.0, 0.0, 0.0])
-            self.up = np.cross(self.forward, self.right)
-            self.up = self.up / np.linalg.norm(self.up)
+            self.right = _WORLD_RIGHT
+            self.up = _cross(self.forward, self.right)
+            self.up = _normalize3(self.up)
         
         # Movement speeds
         self.move_speed = 1e10  # Base movement speed
         self.zoom_speed = 5e10  # Zoom speed
+        self._move_step = np.empty(3)  # Scratch displacement for move_along_axes()
+        self._rotations_since_renormalize = 0  # See _renormalize_if_due
+        
+        # Lock mode offset from the locked body (only meaningful while lock_active)
+        self.lock_offset = np.zeros(3)
+        self.lock_active = False
+        
+        # Planetary mode frame (set up on entering planetary mode)
+        self.planetary_up = None
+        self.planetary_right = None
+        self.manual_rotation = _IDENTITY3.copy()
+        self.planetary_version = -1  # Orientation version handle_planetary_input last produced
+        
+        self.view_matrix = np.eye(4)  # Homogeneous world-to-camera transform, see get_view_matrix
+        self._view_matrix_version = -1
+        
+        # Display angles, recomputed only when the orientation changes
+        self._angle_version = -1
+        self._display_angles = None
+    
+    # Orientation vectors are rows of _basis; assigning one copies into it
+    @property
+    def right(self):
+        return self._basis[0]
+    
+    @right.setter
+    def right(self, value):
+        self._basis[0] = value
+        self._orientation_version += 1
+    
+    @property
+    def up(self):
+        return self._basis[1]
+    
+    @up.setter
+    def up(self, value):
+        self._basis[1] = value
+        self._orientation_version += 1
+    
+    @property
+    def forward(self):
+        return self._basis[2]
+    
+    @forward.setter
+    def forward(self, value):
+        self._basis[2] = value
+        self._orientation_version += 1
     
     def get_forward_vector(self):
         """Get normalized forward vector"""
@@ -49,101 +147,95 @@ class Camera:
         """Get normalized up vector"""
         return self.up
     
+    def get_view_basis(self):
+        """Get the world-to-camera rotation matrix (rows are right, up, forward)"""
+        # The orientation is stored as these rows already, so this is a live view, not a copy
+        return self._basis
+    
+    def get_view_matrix(self):
+        """Get the 4x4 world-to-camera transform: the view basis plus the translation -basis @ position"""
+        basis = self.get_view_basis()
+        if self._view_matrix_version != self._orientation_version:
+            # The rotation block only changes with the orientation; the position can move in place
+            self.view_matrix[:3, :3] = basis
+            self._view_matrix_version = self._orientation_version
+        self.view_matrix[:3, 3] = -(basis @ self.position)
+        return self.view_matrix
+    
     def rotate(self, axis, angle):
         """Rotate camera around arbitrary axis using Rodrigues' formula"""
-        axis = axis / np.linalg.norm(axis)  # Ensure axis is normalized
-        
-        # Rotate all three vectors
-        cos_angle = np.cos(angle)
-        sin_angle = np.sin(angle)
-        
-        def rotate_vector(v):
-            return (
-                v * cos_angle +
-                np.cross(axis, v) * sin_angle +
-                axis * np.dot(axis, v) * (1 - cos_angle)
-            )
-        
-        self.forward = rotate_vector(self.forward)
-        self.up = rotate_vector(self.up)
-        self.right = rotate_vector(self.right)
-        
-        # Renormalize to prevent drift
-        self.forward = self.forward / np.linalg.norm(self.forward)
-        self.up = self.up / np.linalg.norm(self.up)
-        self.right = self.right / np.linalg.norm(self.right)
+        # Rotate all three vectors in one compiled pass
+        self._rotate_rows(0, 3, _normalize3(axis), angle)
     
     def rotate_yaw(self, angle):
         """Rotate camera around world up (Y) axis"""
-        # Use Rodrigues' formula to rotate forward and right vectors around world up
-        world_up = np.array([0, 1, 0])
-        
-        # Rotate forward vector
-        self.forward = _rotate_vector_around_axis(self.forward, world_up, angle)
-        self.forward = self.forward / np.linalg.norm(self.forward)
-        
-        # Rotate right vector
-        self.right = _rotate_vector_around_axis(self.right, world_up, angle)
-        self.right = self.right / np.linalg.norm(self.right)
-        
-        # Recalculate up to maintain orthogonal system
-        self.up = np.cross(self.forward, self.right)
-        self.up = self.up / np.linalg.norm(self.up)
+        # World up is not one of the camera axes, so all three vectors turn
+        self._rotate_rows(0, 3, _WORLD_UP, angle)
     
     def rotate_pitch(self, angle):
         """Rotate camera around local right axis"""
-        # Use Rodrigues' formula to rotate forward and up vectors around right
-        right_normalized = self.right / np.linalg.norm(self.right)
-        
-        # Rotate forward vector
-        self.forward = _rotate_vector_around_axis(self.forward, right_normalized, angle)
-        self.forward = self.forward / np.linalg.norm(self.forward)
-        
-        # Rotate up vector
-        self.up = _rotate_vector_around_axis(self.up, right_normalized, angle)
-        self.up = self.up / np.linalg.norm(self.up)
-        
-        # Recalculate right to maintain orthogonal system
-        self.right = np.cross(self.up, self.forward)
-        self.right = self.right / np.linalg.norm(self.right)
-    
+        # Rotate up and forward (rows 1-2) around right, which stays put
+        self._rotate_rows(1, 3, self.right, angle)
     
     def rotate_roll(self, angle):
         """Rotate camera around local forward axis"""
-        forward_normalized = self.forward / np.linalg.norm(self.forward)
-        
-        # Rotate right vector
-        self.right = _rotate_vector_around_axis(self.right, forward_normalized, angle)
-        self.right = self.right / np.linalg.norm(self.right)
+        # Rotate right and up (rows 0-1) around forward, which stays put
+        self._rotate_rows(0, 2, self.forward, angle)
+    
+    def _rotate_rows(self, first, last, axis, angle):
+        """Rotate basis rows first..last-1 in place around a unit axis"""
+        _rotate_basis_rows(self._basis, first, last, axis, angle)
+        self._orientation_version += 1
+        self._renormalize_if_due()
+    
+    def _renormalize_if_due(self):
+        """Re-orthonormalize the basis every RENORMALIZE_INTERVAL rotations
         
-        # Rotate up vector
-        self.up = _rotate_vector_around_axis(self.up, forward_normalized, angle)
-        self.up = self.up / np.linalg.norm(self.up)
+        Each rotation is orthogonal, so the basis only drifts by rounding error;
+        correcting it periodically is enough to keep it orthonormal.
+        """
+        self._rotations_since_renormalize += 1
+        if self._rotations_since_renormalize < RENORMALIZE_INTERVAL:
+            return
+        self._rotations_since_renormalize = 0
         
-        # Recalculate forward to maintain orthogonal system
-        self.forward = np.cross(self.right, self.up)
-        self.forward = self.forward / np.linalg.norm(self.forward)
-
+        # Gram-Schmidt: keep forward's direction, make up orthogonal to it, rebuild right
+        forward = _normalize3(self.forward)
+        up = self.up - np.dot(self.up, forward) * forward
+        self.forward = forward
+        self.up = _normalize3(up)
+        self.right = _cross(self.up, self.forward)
     
     def reset_rotation(self):
         """Reset camera to default orientation (forward along +Z, up along +Y)"""
-        # Reset to default orientation vectors
-        self.forward = np.array([0.0, 0.0, 1.0])  # Looking along +Z
-        self.up = np.array([0.0, 1.0, 0.0])        # Up along +Y
-        self.right = np.array([1.0, 0.0, 0.0])      # Right along +X
+        # Reset to default orientation vectors: right along +X, up along +Y, looking along +Z
+        self._basis[:] = _IDENTITY3
+        self._orientation_version += 1
+    
+    def enter_planetary_mode(self, body, offset=PLANETARY_OFFSET):
+        """Place camera at the body's north pole looking down, with a fresh planetary frame"""
+        # North pole is at body.position + (0, radius + offset, 0) in world coordinates
+        self.position = body.position + _WORLD_UP * (body.radius + offset)
+        
+        # At north pole: up points away from planet, forward points down, right points east
+        self.up = _WORLD_UP.copy()
+        self.forward = -_WORLD_UP
+        self.right = _WORLD_RIGHT.copy()
         
-        # Ensure all vectors are normalized (they should be already)
-        self.forward = self.forward / np.linalg.norm(self.forward)
-        self.up = self.up / np.linalg.norm(self.up)
-        self.right = self.right / np.linalg.norm(self.right)
+        # Planetary frame: up is the surface normal, right stays along world X (east)
+        self.planetary_up = _WORLD_UP.copy()
+        self.planetary_right = _WORLD_RIGHT.copy()
+        
+        # Clear any existing manual rotation
+        self.manual_rotation = _IDENTITY3.copy()
     
     def align_up_to_vector(self, target_up):
         """Align camera's up vector with target vector while preserving forward direction as much as possible"""
-        target_up = target_up / np.linalg.norm(target_up)  # Ensure normalized
+        target_up = _normalize3(target_up)  # Ensure normalized
         
         # Calculate rotation axis and angle to align current up with target up
-        rotation_axis = np.cross(self.up, target_up)
-        rotation_axis_magnitude = np.linalg.norm(rotation_axis)
+        rotation_axis = _cross(self.up, target_up)
+        rotation_axis_magnitude = _norm3(rotation_axis)
         
         if rotation_axis_magnitude < 1e-6:
             # Vectors are already parallel or anti-parallel
@@ -158,252 +250,362 @@ class Camera:
         
         # Calculate rotation angle
         cos_angle = np.dot(self.up, target_up)
-        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        angle = math.acos(np.clip(cos_angle, -1.0, 1.0))
         
         # Rotate up and right vectors around the calculated axis
         self.up = _rotate_vector_around_axis(self.up, rotation_axis, angle)
         self.right = _rotate_vector_around_axis(self.right, rotation_axis, angle)
         
         # Ensure vectors are normalized
-        self.up = self.up / np.linalg.norm(self.up)
-        self.right = self.right / np.linalg.norm(self.right)
+        self.up = _normalize3(self.up)
+        self.right = _normalize3(self.right)
         
         # Recalculate forward to maintain orthogonal system
-        self.forward = np.cross(self.right, self.up)
-        self.forward = self.forward / np.linalg.norm(self.forward)
+        self.forward = _cross(self.right, self.up)
+        self.forward = _normalize3(self.forward)
     
     def get_yaw(self):
         """Get yaw angle for UI display only"""
-        return np.arctan2(self.forward[0], self.forward[2])
+        return self.get_angles_for_display()[0]
     
     def get_pitch(self):
         """Get pitch angle for UI display only"""
-        horizontal_dist = np.sqrt(self.forward[0]**2 + self.forward[2]**2)
-        return np.arctan2(-self.forward[1], horizontal_dist)
+        return self.get_angles_for_display()[1]
     
     def get_roll(self):
         """Get roll angle for UI display only"""
-        expected_up = np.array([
-            -np.sin(self.get_pitch()) * np.sin(self.get_yaw()),
-            np.cos(self.get_pitch()),
-            -np.sin(self.get_pitch()) * np.cos(self.get_yaw())
-        ])
-        
-        if np.linalg.norm(expected_up) > 0 and np.linalg.norm(self.up) > 0:
-            expected_up = expected_up / np.linalg.norm(expected_up)
-            up_normalized = self.up / np.linalg.norm(self.up)
-            roll_cos = np.clip(np.dot(expected_up, up_normalized), -1, 1)
-            roll = np.arccos(roll_cos)
-            
-            # Determine roll direction
-            cross_product = np.cross(expected_up, up_normalized)
-            if np.dot(cross_product, self.forward) < 0:
-                roll = -roll
-        else:
-            roll = 0
-        
-        return roll
+        return self.get_angles_for_display()[2]
     
-    
-    def move(self, direction, speed_multiplier=1.0):
-        """Move camera in specified direction"""
-        move_distance = self.move_speed * speed_multiplier
-        
-        if direction == 'forward':
-            self.position += self.forward * move_distance
-        elif direction == 'backward':
-            self.position -= self.forward * move_distance
-        elif direction == 'right':
-            self.position += self.right * move_distance
-        elif direction == 'left':
-            self.position -= self.right * move_distance
-        elif direction == 'up':
-            self.position += self.up * move_distance
-        elif direction == 'down':
-            self.position -= self.up * move_distance
+    def move_along_axes(self, right, up, forward, speed_multiplier=1.0):
+        """Move camera by signed step counts along its right, up and forward axes at once"""
+        np.dot((right, up, forward), self.get_view_basis(), out=self._move_step)
+        self._move_step *= self.move_speed * speed_multiplier
+        self.position += self._move_step
     
     def get_angles_for_display(self):
         """Get yaw, pitch, roll angles for UI display only"""
+        if self._angle_version == self._orientation_version:
+            # Orientation unchanged since the last frame (the common case)
+            return self._display_angles
+        self._angle_version = self._orientation_version
+        
+        fx, fy, fz = self.forward
+        
         # Yaw: angle around world Y axis
-        yaw = np.arctan2(self.forward[0], self.forward[2])
+        yaw = math.atan2(fx, fz)
         
         # Pitch: angle from horizontal plane
-        horizontal_dist = np.sqrt(self.forward[0]**2 + self.forward[2]**2)
-        pitch = np.arctan2(-self.forward[1], horizontal_dist)
-        
-        # Roll: angle between actual up and expected up
-        expected_up = np.array([
-            -np.sin(pitch) * np.sin(yaw),
-            np.cos(pitch),
-            -np.sin(pitch) * np.cos(yaw)
-        ])
-        
-        if np.linalg.norm(expected_up) > 0 and np.linalg.norm(self.up) > 0:
-            expected_up = expected_up / np.linalg.norm(expected_up)
-            up_normalized = self.up / np.linalg.norm(self.up)
-            roll_cos = np.clip(np.dot(expected_up, up_normalized), -1, 1)
-            roll = np.arccos(roll_cos)
+        horizontal_dist = math.hypot(fx, fz)
+        pitch = math.atan2(-fy, horizontal_dist)
+        
+        # Roll: angle between actual up and expected up,
+        # (-sin(pitch) * sin(yaw), cos(pitch), -sin(pitch) * cos(yaw)), whose sines and
+        # cosines are read straight off forward's components (and which is unit length)
+        forward_norm = math.hypot(horizontal_dist, fy)
+        up_norm = _norm3(self.up)
+        if forward_norm > 0 and up_norm > 0:
+            sin_pitch = -fy / forward_norm
+            cos_pitch = horizontal_dist / forward_norm
+            if horizontal_dist > 0:
+                sin_yaw = fx / horizontal_dist
+                cos_yaw = fz / horizontal_dist
+            else:
+                # Straight up/down, where atan2 reports a yaw of 0
+                sin_yaw, cos_yaw = 0.0, 1.0
+            ex, ey, ez = -sin_pitch * sin_yaw, cos_pitch, -sin_pitch * cos_yaw
+            ux, uy, uz = self.up / up_norm
+            roll = math.acos(max(-1.0, min(1.0, ex * ux + ey * uy + ez * uz)))
             
-            # Determine roll direction
-            cross_product = np.cross(expected_up, up_normalized)
-            if np.dot(cross_product, self.forward) < 0:
+            # Determine roll direction from the sign of (expected_up x up) . forward
+            if (ey * uz - ez * uy) * fx + (ez * ux - ex * uz) * fy + (ex * uy - ey * ux) * fz < 0:
                 roll = -roll
         else:
             roll = 0
         
-        return yaw, pitch, roll
+        self._display_angles = (yaw, pitch, roll)
+        return self._display_angles
     
     def look_at(self, target):
         """Point camera towards target position"""
         direction = target - self.position
-        if np.linalg.norm(direction) > 0:
-            self.forward = direction / np.linalg.norm(direction)
+        norm = _norm3(direction)
+        if norm > 0:
+            self.forward = direction / norm
             
             # Calculate right and up vectors
-            world_up = np.array([0, 1, 0])
-            self.right = np.cross(world_up, self.forward)
-            if np.linalg.norm(self.right) > 0:
-                self.right = self.right / np.linalg.norm(self.right)
+            self.right = _cross(_WORLD_UP, self.forward)
+            norm = _norm3(self.right)
+            if norm > 0:
+                self.right = self.right / norm
             else:
                 # Looking straight up/down
-                self.right = np.array([1, 0, 0])
+                self.right = _WORLD_RIGHT
             
-            self.up = np.cross(self.forward, self.right)
-            self.up = self.up / np.linalg.norm(self.up)
+            self.up = _cross(self.forward, self.right)
+            self.up = _normalize3(self.up)
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath: it would let the compiler assume away the NaN/inf checks
+    @njit(cache=True)
+    def _project(pos, cam_pos, basis, width, height):
+        """Compiled scalar projection; returns (ok, screen_x, screen_y, cam_z, scale)"""
+        dx = pos[0] - cam_pos[0]
+        dy = pos[1] - cam_pos[1]
+        dz = pos[2] - cam_pos[2]
+        cam_x = dx * basis[0, 0] + dy * basis[0, 1] + dz * basis[0, 2]
+        cam_y = dx * basis[1, 0] + dy * basis[1, 1] + dz * basis[1, 2]
+        cam_z = dx * basis[2, 0] + dy * basis[2, 1] + dz * basis[2, 2]
+        
+        if cam_z <= NEAR_CLAMP:
+            cam_z = NEAR_CLAMP
+        if not (math.isfinite(cam_x) and math.isfinite(cam_y) and math.isfinite(cam_z)):
+            return False, 0, 0, 0.0, 0.0
+        
+        # Finite inputs and cam_z >= NEAR_CLAMP keep everything below finite too
+        scale = FOV_FACTOR / cam_z
+        screen_x = width / 2 + cam_x * scale
+        screen_y = height / 2 - cam_y * scale
+        return True, int(screen_x), int(screen_y), cam_z, scale
+    
+    @njit(cache=True)
+    def _project_points(points, view, consts, screen_x, screen_y, cam_z, scale, valid):
+        """Compiled batched projection, filling the output arrays in a single pass over the points
+        
+        consts holds (NEAR_CLAMP, FOV_FACTOR, width / 2, height / 2) in the points' dtype,
+        so float32 input is projected in float32 like the NumPy path.
+        """
+        near, fov, half_width, half_height = consts[0], consts[1], consts[2], consts[3]
+        for i in range(points.shape[0]):
+            x = points[i, 0]
+            y = points[i, 1]
+            z = points[i, 2]
+            cam_x = x * view[0, 0] + y * view[0, 1] + z * view[0, 2] + view[0, 3]
+            cam_y = x * view[1, 0] + y * view[1, 1] + z * view[1, 2] + view[1, 3]
+            depth = x * view[2, 0] + y * view[2, 1] + z * view[2, 2] + view[2, 3]
+            
+            # Same near clamp as np.maximum: NaN depths stay NaN
+            if depth < near:
+                depth = near
+            cam_z[i] = depth
+            
+            s = fov / depth
+            sx = half_width + cam_x * s
+            sy = half_height - cam_y * s
+            if math.isfinite(sx) and math.isfinite(sy):
+                screen_x[i] = int(sx)
+                screen_y[i] = int(sy)
+                scale[i] = s
+                valid[i] = True
+            else:
+                screen_x[i] = 0
+                screen_y[i] = 0
+                scale[i] = 0
+                valid[i] = False
 
 
 def project_3d_to_2d(pos_3d, camera, width, height):
-    """Proper 3D to 2D projection with camera transformation"""
-    # Transform to camera space (translate)
-    relative_pos = pos_3d - camera.position
+    """Proper 3D to 2D projection with camera transformation
     
-    # Transform to camera space using camera vectors
-    x, y, z = relative_pos
+    Returns (screen_x, screen_y, cam_z, scale), or four Nones if the point can't be projected.
+    """
+    if NUMBA_AVAILABLE:
+        ok, screen_x, screen_y, cam_z, scale = _project(pos_3d, camera.position, camera.get_view_basis(), width, height)
+        if not ok:
+            return None, None, None, None
+        return screen_x, screen_y, cam_z, scale
     
-    # Get camera axes
-    right = camera.get_right_vector()
-    up = camera.get_up_vector()
-    forward = camera.get_forward_vector()
+    # Transform to camera space (translate)
+    relative_pos = pos_3d - camera.position
     
-    # Transform to camera coordinates (dot products)
-    cam_x = np.dot(relative_pos, right)
-    cam_y = np.dot(relative_pos, up)
-    cam_z = np.dot(relative_pos, forward)
+    # Transform to camera coordinates (one matvec with the stacked camera axes)
+    cam_x, cam_y, cam_z = camera.get_view_basis() @ relative_pos
     
     # Perspective projection with safety checks
-    if cam_z <= 1e8:  # Prevent division by zero (much smaller threshold)
-        cam_z = 1e8
+    if cam_z <= NEAR_CLAMP:  # Prevent division by zero (much smaller threshold)
+        cam_z = NEAR_CLAMP
     
-    # Check for NaN values and handle them
-    if not np.isfinite(cam_x) or not np.isfinite(cam_y) or not np.isfinite(cam_z):
+    # Check for NaN values and handle them; this is the only check needed, since with finite
+    # coordinates and cam_z >= NEAR_CLAMP the scale and screen coordinates are finite as well
+    if not (math.isfinite(cam_x) and math.isfinite(cam_y) and math.isfinite(cam_z)):
         return None, None, None, None
     
     # Field of view based scaling
-    fov_factor = 500.0  # Adjust this for zoom level
-    scale = fov_factor / cam_z
-    
-    # Check scale for NaN or infinite values
-    if not np.isfinite(scale):
-        return None, None, None, None
+    scale = FOV_FACTOR / cam_z
     
     # Project to screen coordinates
-    screen_x = int(width / 2 + cam_x * scale)
-    screen_y = int(height / 2 - cam_y * scale)
+    screen_x = width / 2 + cam_x * scale
+    screen_y = height / 2 - cam_y * scale
     
-    # Final check for valid screen coordinates
-    if not np.isfinite(screen_x) or not np.isfinite(screen_y):
-        return None, None, None, None
+    return int(screen_x), int(screen_y), cam_z, scale
+
+
+def project_points_3d_to_2d(points, camera, width, height):
+    """Project an (N, 3) array of points at once, matching project_3d_to_2d per point
     
-    return screen_x, screen_y, cam_z, scale
+    The math runs in the points' own precision, so float32 input stays float32.
+    Returns integer screen x/y arrays, camera depths, scales and a mask of finite projections.
+    """
+    view = camera.get_view_matrix().astype(points.dtype, copy=False)
+    
+    if NUMBA_AVAILABLE:
+        n = len(points)
+        screen_x = np.empty(n, dtype=int)
+        screen_y = np.empty(n, dtype=int)
+        cam_z = np.empty(n, dtype=points.dtype)
+        scale = np.empty(n, dtype=points.dtype)
+        valid = np.empty(n, dtype=bool)
+        consts = np.array((NEAR_CLAMP, FOV_FACTOR, width / 2, height / 2), dtype=points.dtype)
+        _project_points(np.ascontiguousarray(points), view, consts, screen_x, screen_y, cam_z, scale, valid)
+        return screen_x, screen_y, cam_z, scale, valid
+    
+    # Camera space via one matmul with the view matrix (rotation, then its translation column)
+    cam = points @ view[:3, :3].T
+    cam += view[:3, 3]
+    
+    # Same near clamp and scaling as the scalar projection (NaN depths stay NaN)
+    cam_z = np.maximum(cam[:, 2], NEAR_CLAMP)
+    scale = FOV_FACTOR / cam_z
+    screen_x = width / 2 + cam[:, 0] * scale
+    screen_y = height / 2 - cam[:, 1] * scale
+    
+    # Invalid projections are zeroed so the integer conversion stays defined
+    valid = np.isfinite(screen_x) & np.isfinite(screen_y)
+    screen_x = np.where(valid, screen_x, 0.0).astype(int)
+    screen_y = np.where(valid, screen_y, 0.0).astype(int)
+    scale = np.where(valid, scale, 0.0)
+    
+    return screen_x, screen_y, cam_z, scale, valid
 
 
-def check_hover(mouse_pos, bodies, camera, width, height):
-    """Check if mouse is hovering over any body"""
+def hover_index(mouse_pos, positions, radii, camera, width, height, projection=None):
+    """Index of the body under the mouse cursor, or None
+    
+    positions is the packed (N, 3) array of body positions (e.g. a float32 render copy)
+    and radii the packed (N,) array of their radii. projection optionally supplies this frame's
+    (in_front, proj_x, proj_y, scale, valid) arrays, as returned by draw_bodies, so the bodies
+    aren't culled and projected a second time.
+    """
+    if len(radii) == 0:
+        return None
+    
     mouse_x, mouse_y = mouse_pos
     
-    for body in bodies:
-        proj_x, proj_y, cam_z, scale = project_3d_to_2d(body.position, camera, width, height)
+    if projection is None:
+        # Cull bodies behind the camera with one depth pass before projecting
+        forward = camera.get_view_basis()[2].astype(positions.dtype, copy=False)
+        depth = (positions - camera.position.astype(positions.dtype, copy=False)) @ forward
+        in_front = np.flatnonzero(depth > 0)
+        if len(in_front) == 0:
+            return None
         
-        # Skip if projection failed
-        if proj_x is None or proj_y is None or cam_z is None or scale is None:
-            continue
-        
-        # Check if projection is valid and body is visible
-        if (isinstance(proj_x, (int, float)) and isinstance(proj_y, (int, float)) and
-            cam_z > 0 and -100 <= proj_x <= width + 100 and 
-            -100 <= proj_y <= height + 100):
-            
-            # Calculate screen radius for hover detection
-            screen_radius = max(10, int(body.radius * scale))
-            
-            # Check if mouse is within body radius
-            distance = ((mouse_x - proj_x) ** 2 + (mouse_y - proj_y) ** 2) ** 0.5
-            if distance <= screen_radius:
-                return body
-    
-    return None
+        # Project the remaining bodies in one pass
+        proj_x, proj_y, _, scale, valid = project_points_3d_to_2d(positions[in_front], camera, width, height)
+    else:
+        # The caller's cull and projection of the same bodies
+        in_front, proj_x, proj_y, scale, valid = projection
+        if len(in_front) == 0:
+            return None
+    radii = radii[in_front]
+    
+    # Mouse must be within the body's screen radius (at least 10 px for small bodies);
+    # a bounding-box test narrows the candidates before the exact distance check
+    screen_radius = np.maximum(10, (radii * scale).astype(int))
+    dx = mouse_x - proj_x
+    dy = mouse_y - proj_y
+    candidates = np.flatnonzero(valid & (np.abs(dx) <= screen_radius) & (np.abs(dy) <= screen_radius))
+    
+    # Body must be visible (within the margin around the screen); only the few candidates need checking
+    x = proj_x[candidates]
+    y = proj_y[candidates]
+    candidates = candidates[(x >= -100) & (x <= width + 100) & (y >= -100) & (y <= height + 100)]
+    if len(candidates) == 0:
+        return None
+    
+    dx = dx[candidates]
+    dy = dy[candidates]
+    r = screen_radius[candidates]
+    distance_sq = dx * dx + dy * dy
+    hits = distance_sq <= r * r
+    
+    if not hits.any():
+        return None
+    
+    # Closest body to the cursor wins when several overlap
+    return int(in_front[candidates[np.argmin(np.where(hits, distance_sq, np.inf))]])
+
+
+def check_hover(mouse_pos, bodies, camera, width, height, positions, radii, projection=None):
+    """Check if mouse is hovering over any body, returning the body itself"""
+    index = hover_index(mouse_pos, positions, radii, camera, width, height, projection)
+    return bodies[index] if index is not None else None
 
 
 def handle_locked_camera_input(camera, keys, movement_speed_multiplier=1.0, locked_body=None):
     """Handle camera input when locked to a body - allows orbital movement"""
-    if not locked_body or not hasattr(camera, 'lock_offset'):
+    if not locked_body or not camera.lock_active:
         return
     
-    # Calculate forward vector (from camera to planet)
-    direction_to_body = locked_body.position - camera.position
-    if np.linalg.norm(direction_to_body) > 0:
-        forward = direction_to_body / np.linalg.norm(direction_to_body)
-    else:
-        forward = np.array([0, 0, 1])
-    
-    # Calculate right and up vectors from forward
-    # Right is perpendicular to forward and world up
-    world_up = np.array([0, 1, 0])
-    right = np.cross(world_up, forward)
-    if np.linalg.norm(right) > 0:
-        right = right / np.linalg.norm(right)
-    else:
-        # If looking straight up/down, use different right vector
-        right = np.array([1, 0, 0])
-    
-    # Up is perpendicular to forward and right
-    up = np.cross(forward, right)
-    if np.linalg.norm(up) > 0:
-        up = up / np.linalg.norm(up)
-    
-    # Orbital movement (WASD) - move camera around the body
-    orbital_speed = camera.move_speed * movement_speed_multiplier
-    
-    if keys[K_w]:
-        # Move up (orbit vertically)
-        camera.lock_offset += up * orbital_speed
-    if keys[K_s]:
-        # Move down (orbit vertically)
-        camera.lock_offset -= up * orbital_speed
-    if keys[K_a]:
-        # Move left (orbit horizontally)
-        camera.lock_offset -= right * orbital_speed
-    if keys[K_d]:
-        # Move right (orbit horizontally)
-        camera.lock_offset += right * orbital_speed
+    # Orbital movement (WASD) - move camera around the body; the orbit frame is only needed while one is held
+    if keys[K_w] or keys[K_s] or keys[K_a] or keys[K_d]:
+        # Calculate forward vector (from camera to planet)
+        direction_to_body = locked_body.position - camera.position
+        distance_to_body = _norm3(direction_to_body)
+        if distance_to_body > 0:
+            forward = direction_to_body / distance_to_body
+        else:
+            forward = _WORLD_FORWARD
+        
+        # Calculate right and up vectors from forward
+        # Right is perpendicular to forward and world up
+        right = _cross(_WORLD_UP, forward)
+        right_norm = _norm3(right)
+        if right_norm > 0:
+            right = right / right_norm
+        else:
+            # If looking straight up/down, use different right vector
+            right = _WORLD_RIGHT
+        
+        # Up is perpendicular to forward and right (both unit length, so up already is too)
+        up = _cross(forward, right)
+        
+        orbital_speed = camera.move_speed * movement_speed_multiplier
+        
+        if keys[K_w]:
+            # Move up (orbit vertically)
+            camera.lock_offset += up * orbital_speed
+        if keys[K_s]:
+            # Move down (orbit vertically)
+            camera.lock_offset -= up * orbital_speed
+        if keys[K_a]:
+            # Move left (orbit horizontally)
+            camera.lock_offset -= right * orbital_speed
+        if keys[K_d]:
+            # Move right (orbit horizontally)
+            camera.lock_offset += right * orbital_speed
     
     # Zoom (QE) - move closer/further from body
     zoom_speed = camera.zoom_speed * movement_speed_multiplier
     
+    if keys[K_q] or keys[K_e]:
+        # Zooming only changes the offset's length, so one step along it serves both keys
+        offset_distance = _norm3(camera.lock_offset)
+        if offset_distance > 0:
+            zoom_step = camera.lock_offset * (zoom_speed / offset_distance)
+        else:
+            zoom_step = _WORLD_FORWARD * zoom_speed
     if keys[K_q]:
         # Zoom out (move further away)
-        direction = camera.lock_offset / np.linalg.norm(camera.lock_offset) if np.linalg.norm(camera.lock_offset) > 0 else np.array([0, 0, 1])
-        camera.lock_offset += direction * zoom_speed
+        camera.lock_offset += zoom_step
     if keys[K_e]:
         # Zoom in (move closer)
-        direction = camera.lock_offset / np.linalg.norm(camera.lock_offset) if np.linalg.norm(camera.lock_offset) > 0 else np.array([0, 0, 1])
-        camera.lock_offset -= direction * zoom_speed
+        camera.lock_offset -= zoom_step
         
         # Prevent getting too close
         min_distance = 1e10  # Minimum distance from body
-        current_distance = np.linalg.norm(camera.lock_offset)
-        if current_distance < min_distance or not np.isfinite(current_distance):
-            if current_distance > 0 and np.isfinite(current_distance):
+        current_distance = _norm3(camera.lock_offset)
+        if current_distance < min_distance or not math.isfinite(current_distance):
+            if current_distance > 0 and math.isfinite(current_distance):
                 direction_norm = camera.lock_offset / current_distance
                 camera.lock_offset = direction_norm * min_distance
             else:
@@ -421,7 +623,7 @@ def get_planetary_coordinates(camera, planetary_body):
     
     # Calculate anchor vector from body to camera
     anchor_vector = camera.position - planetary_body.position
-    distance = np.linalg.norm(anchor_vector)
+    distance = _norm3(anchor_vector)
     
     if distance == 0:
         return None, None, None, None
@@ -435,13 +637,13 @@ def get_planetary_coordinates(camera, planetary_body):
     
     # Calculate position in planetary coordinate system
     # Since we're at fixed distance, we can use the anchor direction
-    anchor_normalized = anchor_vector / distance
+    dx, dy, dz = anchor_vector
     
     # Calculate latitude from the up component (Y axis)
-    latitude = np.degrees(np.arcsin(np.clip(anchor_normalized[1], -1, 1)))
+    latitude = math.degrees(math.asin(max(-1.0, min(1.0, dy / distance))))
     
-    # Calculate longitude from the XZ components
-    longitude = np.degrees(np.arctan2(anchor_normalized[0], anchor_normalized[2]))
+    # Calculate longitude from the XZ components (atan2 doesn't need them normalized)
+    longitude = math.degrees(math.atan2(dx, dz))
     
     # Calculate altitude above surface
     altitude = distance - planetary_body.radius
@@ -451,26 +653,43 @@ def get_planetary_coordinates(camera, planetary_body):
 
 def _rotate_vector_around_axis(vector, axis, angle):
     """Rotate vector around axis using Rodrigues' formula"""
-    cos_angle = np.cos(angle)
-    sin_angle = np.sin(angle)
-    
-    return (
-        vector * cos_angle +
-        np.cross(axis, vector) * sin_angle +
-        axis * np.dot(axis, vector) * (1 - cos_angle)
-    )
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    
+    # Written out per component (v*cos + (a x v)*sin + a*(a.v)*(1-cos)) so Numba can compile it
+    vx, vy, vz = vector[0], vector[1], vector[2]
+    ax, ay, az = axis[0], axis[1], axis[2]
+    along_axis = (ax * vx + ay * vy + az * vz) * (1 - cos_angle)
+    
+    rotated = np.empty(3)
+    rotated[0] = vx * cos_angle + (ay * vz - az * vy) * sin_angle + ax * along_axis
+    rotated[1] = vy * cos_angle + (az * vx - ax * vz) * sin_angle + ay * along_axis
+    rotated[2] = vz * cos_angle + (ax * vy - ay * vx) * sin_angle + az * along_axis
+    return rotated
 
 
-def _rotate_vector_around_axis(vector, axis, angle):
-    """Rotate vector around axis using Rodrigues' formula"""
-    cos_angle = np.cos(angle)
-    sin_angle = np.sin(angle)
-    
-    return (
-        vector * cos_angle +
-        np.cross(axis, vector) * sin_angle +
-        axis * np.dot(axis, vector) * (1 - cos_angle)
-    )
+if NUMBA_AVAILABLE:
+    _rotate_vector_around_axis = njit(cache=True)(_rotate_vector_around_axis)
+
+
+def _rotate_basis_rows(basis, first, last, axis, angle):
+    """Rotate rows first..last-1 of a (3, 3) basis in place around a unit axis (Rodrigues' formula)"""
+    # Trig is shared by every row, so it's evaluated once up front
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
+    one_minus_cos = 1 - cos_angle
+    ax, ay, az = axis[0], axis[1], axis[2]
+    
+    for row in range(first, last):
+        vx, vy, vz = basis[row, 0], basis[row, 1], basis[row, 2]
+        along_axis = (ax * vx + ay * vy + az * vz) * one_minus_cos
+        basis[row, 0] = vx * cos_angle + (ay * vz - az * vy) * sin_angle + ax * along_axis
+        basis[row, 1] = vy * cos_angle + (az * vx - ax * vz) * sin_angle + ay * along_axis
+        basis[row, 2] = vz * cos_angle + (ax * vy - ay * vx) * sin_angle + az * along_axis
+
+
+if NUMBA_AVAILABLE:
+    _rotate_basis_rows = njit(cache=True)(_rotate_basis_rows)
 
 
 def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetary_body=None):
@@ -489,45 +708,47 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
     # === SECTION 1: INITIALIZATION ===
     # Calculate anchor vector from camera to body
     anchor_vector = planetary_body.position - camera.position
-    current_distance = np.linalg.norm(anchor_vector)
+    current_distance = _norm3(anchor_vector)
     
     if current_distance == 0:
         return
     
-    # Normalize anchor vector (points from camera to body)
-    anchor_normalized = anchor_vector / current_distance
-    
     # Initialize planetary coordinate system if needed
-    if not hasattr(camera, 'planetary_right'):
+    if camera.planetary_right is None:
         # Initialize planetary coordinate system with correct vector relationships
-        # anchor_normalized points FROM camera TO planet (inward)
-        # planetary_up should point AWAY from planet (outward) = -anchor_normalized
+        # anchor_vector points FROM camera TO planet (inward)
+        # planetary_up should point AWAY from planet (outward) = -anchor_vector, normalized
         # planetary_right should be TANGENT to surface (perpendicular to both)
         
-        # CRITICAL: planetary_up is simply negative of anchor (away from planet)
-        camera.planetary_up = -anchor_normalized
-        if np.linalg.norm(camera.planetary_up) > 0:
-            camera.planetary_up = camera.planetary_up / np.linalg.norm(camera.planetary_up)
-        else:
-            camera.planetary_up = np.array([0, 1, 0])
+        # CRITICAL: planetary_up is simply negative of anchor (away from planet);
+        # the anchor is only normalized here, the one place that uses its direction
+        camera.planetary_up = anchor_vector / -current_distance
         
         # RECALCULATE planetary_right around the new planetary_up
         # planetary_right should be tangent to surface, perpendicular to planetary_up
         # Use world_up as reference to find tangent direction
-        world_up = np.array([0, 1, 0])
-        camera.planetary_right = np.cross(camera.planetary_up, world_up)
-        if np.linalg.norm(camera.planetary_right) > 0:
-            camera.planetary_right = camera.planetary_right / np.linalg.norm(camera.planetary_right)
+        camera.planetary_right = _cross(camera.planetary_up, _WORLD_UP)
+        norm = _norm3(camera.planetary_right)
+        if norm > 0:
+            camera.planetary_right = camera.planetary_right / norm
         else:
             # If planetary_up is parallel to world_up, use different approach
-            camera.planetary_right = np.array([1, 0, 0])
+            camera.planetary_right = _WORLD_RIGHT.copy()
         
         # Verify coordinate system is orthogonal
         # This should be: planetary_up ⊥ planetary_right ⊥ base_forward
         # base_forward = planetary_right × planetary_up (will be calculated later)
         
         # Initialize manual rotation vectors (identity)
-        camera.manual_rotation = np.eye(3)  # 3x3 identity matrix
+        camera.manual_rotation = _IDENTITY3.copy()  # 3x3 identity matrix
+    
+    # Without input the planetary frame and manual rotation stay put, so the orientation
+    # built from them last frame still holds unless something else has turned the camera since
+    if (camera.planetary_version == camera._orientation_version and
+            not (keys[K_a] or keys[K_d] or keys[K_w] or keys[K_s] or
+                 keys[K_LEFT] or keys[K_RIGHT] or keys[K_UP] or keys[K_DOWN])):
+        _correct_planetary_distance(camera, planetary_body)
+        return
     
     # === SECTION 2: MOVEMENT ===
     # Movement speed (angular velocity around the planet)
@@ -553,9 +774,9 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
     # Apply arrow key rotations to manual rotation matrix
     # IMPORTANT: Apply rotations in consistent order to avoid unwanted roll
     
-    # Create rotation matrices for this frame
-    yaw_matrix = np.eye(3)
-    pitch_matrix = np.eye(3)
+    # Rotation matrices for this frame (None when that key pair isn't held)
+    yaw_matrix = None
+    pitch_matrix = None
     
     if keys[K_LEFT] or keys[K_RIGHT]:
         rotation_dir = 1 if keys[K_RIGHT] else -1
@@ -573,13 +794,14 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
         # Solution: Use camera's current right vector if stable, otherwise use planetary_right as fallback
         
         # First try to use camera's current right vector
-        if hasattr(camera, 'right') and np.linalg.norm(camera.right) > 1e-6:
+        if _norm3(camera.right) > 1e-6:
             local_right = camera.right
         else:
             # Fallback: calculate from forward and planetary_up
-            local_right = np.cross(camera.forward, camera.planetary_up)
-            if np.linalg.norm(local_right) > 1e-6:
-                local_right = local_right / np.linalg.norm(local_right)
+            local_right = _cross(camera.forward, camera.planetary_up)
+            norm = _norm3(local_right)
+            if norm > 1e-6:
+                local_right = local_right / norm
             else:
                 # Final fallback: use planetary_right (always stable)
                 local_right = camera.planetary_right
@@ -588,61 +810,50 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
     
     # Apply rotations in consistent order: pitch first, then yaw
     # This ensures that yawing while pitched doesn't induce unwanted roll
-    combined_rotation = pitch_matrix @ yaw_matrix
-    camera.manual_rotation = combined_rotation @ camera.manual_rotation
+    if yaw_matrix is not None and pitch_matrix is not None:
+        camera.manual_rotation = (pitch_matrix @ yaw_matrix) @ camera.manual_rotation
+    elif yaw_matrix is not None:
+        camera.manual_rotation = yaw_matrix @ camera.manual_rotation
+    elif pitch_matrix is not None:
+        camera.manual_rotation = pitch_matrix @ camera.manual_rotation
     
     # === SECTION 4: FINAL ORIENTATION (moved here to prevent wobble) ===
     # Calculate base forward vector from planetary coordinate system
-    base_forward = np.cross(camera.planetary_right, camera.planetary_up)
-    if np.linalg.norm(base_forward) > 0:
-        base_forward = base_forward / np.linalg.norm(base_forward)
+    base_forward = _cross(camera.planetary_right, camera.planetary_up)
+    norm = _norm3(base_forward)
+    if norm > 0:
+        base_forward = base_forward / norm
     else:
-        base_forward = np.array([0, 0, 1])
+        base_forward = _WORLD_FORWARD
     
     # CRITICAL FIX: Apply manual rotation to base vectors
     # This should be the ONLY place manual_rotation is applied
+    # (up is rebuilt from the other two below, so it doesn't need rotating)
     final_forward = camera.manual_rotation @ base_forward
     final_right = camera.manual_rotation @ camera.planetary_right
-    final_up = camera.manual_rotation @ camera.planetary_up  # Apply rotation to up too!
     
     # Re-orthogonalize the system using Gram-Schmidt process
     # 1. Normalize forward
-    final_forward = final_forward / np.linalg.norm(final_forward)
+    final_forward = _normalize3(final_forward)
     
     # 2. Make right orthogonal to forward
     final_right = final_right - np.dot(final_right, final_forward) * final_forward
-    final_right = final_right / np.linalg.norm(final_right)
+    final_right = _normalize3(final_right)
     
-    # 3. Calculate up as cross product to ensure orthogonality
-    final_up = np.cross(final_forward, final_right)
-    final_up = final_up / np.linalg.norm(final_up)
+    # 3. Calculate up as cross product to ensure orthogonality (unit length, as both factors are)
+    final_up = _cross(final_forward, final_right)
     
     # Update camera vectors directly
     camera.forward = final_forward
     camera.right = final_right
     camera.up = final_up
+    camera.planetary_version = camera._orientation_version
     
     # === SECTION 5: W/S MOVEMENT (moved after final orientation) ===
     # Move camera position along planetary forward vector (north/south movement)
     if keys[K_w] or keys[K_s]:
         # CRITICAL FIX: Use camera's CURRENT facing direction, not base_forward
         # The camera vectors are already updated from final_orientation
-        current_facing = camera.forward  # Use the already-updated camera forward
-        
-        # CRITICAL FIX: Project view direction onto tangent plane correctly
-        # The tangent plane is defined by planetary_up (normal to surface)
-        # We want the component of camera.forward that lies in this plane
-        # Formula: projected = original - (original·normal) * normal
-        view_direction = camera.forward
-        projection_scalar = np.dot(view_direction, camera.planetary_up)
-        movement_direction = view_direction - projection_scalar * camera.planetary_up
-        
-        # Normalize the movement direction
-        if np.linalg.norm(movement_direction) > 1e-6:
-            movement_direction = movement_direction / np.linalg.norm(movement_direction)
-        else:
-            # Fallback: use planetary_right if projection fails
-            movement_direction = camera.planetary_right
         
         # Move along current facing direction (not base_forward!)
         movement_dir = 1 if keys[K_w] else -1  # W=positive, S=negative
@@ -650,55 +861,40 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
         
         # Since we're on a sphere, we need to move along the great circle
         # This is equivalent to rotating the position around the axis perpendicular to both planetary_up and movement direction
-        radial_vector = camera.position - planetary_body.position
-        if np.linalg.norm(radial_vector) > 0:
-            radial_vector = radial_vector / np.linalg.norm(radial_vector)
-        else:
-            radial_vector = np.array([0, 1, 0])  # Fallback
         
-        # Calculate rotation axis (perpendicular to planetary_up and movement directions)
+        # Calculate rotation axis (perpendicular to planetary_up and the view direction's tangent part)
         # CRITICAL FIX: Use planetary_up, not radial_vector, to avoid axis collapse
-        # When movement_direction aligns with radial_vector, cross product becomes small
-        # But planetary_up is always perpendicular to radial_vector, ensuring stable rotation
-        rotation_axis = np.cross(camera.planetary_up, movement_direction)
-        if np.linalg.norm(rotation_axis) > 0:
-            rotation_axis = rotation_axis / np.linalg.norm(rotation_axis)
+        # The tangent part is forward - (forward·up) * up, and since up x up = 0 its cross
+        # product with up equals up x forward, so the projection itself is never needed
+        rotation_axis = _cross(camera.planetary_up, camera.forward)
+        norm = _norm3(rotation_axis)
+        if norm > 1e-6:
+            rotation_axis = rotation_axis / norm
         else:
-            # If movement is parallel to planetary_up (unlikely), use planetary_right as fallback
-            rotation_axis = camera.planetary_right
+            # Looking along planetary_up leaves no tangent direction: move along planetary_right
+            rotation_axis = _cross(camera.planetary_up, camera.planetary_right)
+            norm = _norm3(rotation_axis)
+            if norm > 0:
+                rotation_axis = rotation_axis / norm
+            else:
+                # If planetary_right is parallel to planetary_up (unlikely), rotate around it directly
+                rotation_axis = camera.planetary_right
         
         # Rotate position around this axis to move along movement direction
-        relative_pos = camera.position - planetary_body.position
-        new_relative_pos = _rotate_vector_around_axis(
-            relative_pos, rotation_axis, movement_distance
-        )
-        camera.position = planetary_body.position + new_relative_pos
-        
-        # CRITICAL FIX: Only update planetary_up, NOT planetary_right
-        # planetary_right should remain stable to prevent coordinate system flipping
-        new_anchor_vector = planetary_body.position - camera.position
-        if np.linalg.norm(new_anchor_vector) > 0:
-            new_anchor_normalized = new_anchor_vector / np.linalg.norm(new_anchor_vector)
-            camera.planetary_up = -new_anchor_normalized
-            if np.linalg.norm(camera.planetary_up) > 0:
-                camera.planetary_up = camera.planetary_up / np.linalg.norm(camera.planetary_up)
-            else:
-                camera.planetary_up = np.array([0, 1, 0])
-            
-            # DO NOT UPDATE planetary_right - keep it stable!
-            # This prevents the coordinate system from flipping
+        _orbit_planetary_camera(camera, planetary_body, rotation_axis, movement_distance)
     
     # === SECTION 5.5: A/D STRAFING MOVEMENT ===
     # Move along camera's local right direction, projected onto tangent plane
     if keys[K_a] or keys[K_d]:
         # Get camera's local right vector
-        if hasattr(camera, 'right') and np.linalg.norm(camera.right) > 1e-6:
+        if _norm3(camera.right) > 1e-6:
             local_right = camera.right
         else:
             # Fallback: calculate from forward and planetary_up
-            local_right = np.cross(camera.forward, camera.planetary_up)
-            if np.linalg.norm(local_right) > 1e-6:
-                local_right = local_right / np.linalg.norm(local_right)
+            local_right = _cross(camera.forward, camera.planetary_up)
+            norm = _norm3(local_right)
+            if norm > 1e-6:
+                local_right = local_right / norm
             else:
                 # Final fallback: use planetary_right
                 local_right = camera.planetary_right
@@ -706,24 +902,27 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
         # Project local_right onto tangent plane (perpendicular to planetary_up)
         # This ensures strafing stays tangent to the planet surface
         strafe_direction = local_right - np.dot(local_right, camera.planetary_up) * camera.planetary_up
-        if np.linalg.norm(strafe_direction) > 1e-6:
-            strafe_direction = strafe_direction / np.linalg.norm(strafe_direction)
+        norm = _norm3(strafe_direction)
+        if norm > 1e-6:
+            strafe_direction = strafe_direction / norm
         else:
             # If projection failed, use planetary_right as fallback
             strafe_direction = camera.planetary_right
         
         # Calculate rotation axis for strafing movement
         # Similar to W/S movement, but using strafe_direction instead of movement_direction
-        rotation_axis = np.cross(camera.planetary_up, strafe_direction)
-        if np.linalg.norm(rotation_axis) > 0:
-            rotation_axis = rotation_axis / np.linalg.norm(rotation_axis)
+        rotation_axis = _cross(camera.planetary_up, strafe_direction)
+        norm = _norm3(rotation_axis)
+        if norm > 0:
+            rotation_axis = rotation_axis / norm
         else:
             # If strafe is parallel to planetary_up (unlikely), use planetary_forward as fallback
-            planetary_forward = np.cross(camera.planetary_right, camera.planetary_up)
-            if np.linalg.norm(planetary_forward) > 0:
-                planetary_forward = planetary_forward / np.linalg.norm(planetary_forward)
+            planetary_forward = _cross(camera.planetary_right, camera.planetary_up)
+            norm = _norm3(planetary_forward)
+            if norm > 0:
+                planetary_forward = planetary_forward / norm
             else:
-                planetary_forward = np.array([0, 0, 1])
+                planetary_forward = _WORLD_FORWARD
             rotation_axis = planetary_forward
         
         # Calculate strafing movement distance
@@ -731,34 +930,25 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
         strafe_distance = angular_speed * strafe_dir
         
         # Rotate position around this axis to strafe along strafe_direction
-        relative_pos = camera.position - planetary_body.position
-        new_relative_pos = _rotate_vector_around_axis(
-            relative_pos, rotation_axis, strafe_distance
-        )
-        camera.position = planetary_body.position + new_relative_pos
-        
-        # Update planetary_up after strafing (same as W/S movement)
-        new_anchor_vector = planetary_body.position - camera.position
-        if np.linalg.norm(new_anchor_vector) > 0:
-            new_anchor_normalized = new_anchor_vector / np.linalg.norm(new_anchor_vector)
-            camera.planetary_up = -new_anchor_normalized
-            if np.linalg.norm(camera.planetary_up) > 0:
-                camera.planetary_up = camera.planetary_up / np.linalg.norm(camera.planetary_up)
-            else:
-                camera.planetary_up = np.array([0, 1, 0])
-            
-            # DO NOT UPDATE planetary_right - keep it stable!
-            # This prevents the coordinate system from flipping
+        _orbit_planetary_camera(camera, planetary_body, rotation_axis, strafe_distance)
     
     # === SECTION 6: DISTANCE CORRECTION ===
+    _correct_planetary_distance(camera, planetary_body)
+
+
+def _correct_planetary_distance(camera, planetary_body):
+    """Ease the camera back towards its planetary mode distance from the body"""
     # Fix camera distance to planetary body
     # CRITICAL FIX: Only apply small correction, don't override movement
-    new_anchor_vector = planetary_body.position - camera.position
-    new_distance = np.linalg.norm(new_anchor_vector)
+    # Plain float math: this runs every frame, and NumPy dispatch dominates on 3-vectors
+    bx, by, bz = planetary_body.position.tolist()
+    cx, cy, cz = camera.position.tolist()
+    ax, ay, az = bx - cx, by - cy, bz - cz
+    new_distance = math.sqrt(ax * ax + ay * ay + az * az)
     
     if new_distance > 0:
         # Fix distance to radius with gentle correction
-        target_distance = planetary_body.radius + 7e7
+        target_distance = planetary_body.radius + PLANETARY_OFFSET
         distance_error = new_distance - target_distance
         
         # Only correct if distance error is significant (> 1% of target)
@@ -767,57 +957,76 @@ def handle_planetary_input(camera, keys, movement_speed_multiplier=1.0, planetar
             correction_factor = 0.1  # Only correct 10% of error per frame
             correction_amount = distance_error * correction_factor
             
-            new_anchor_normalized = new_anchor_vector / new_distance
-            corrected_position = planetary_body.position - new_anchor_normalized * (new_distance - correction_amount)
-            camera.position = corrected_position
+            # Step back from the body along the normalized anchor vector
+            anchor_scale = (new_distance - correction_amount) / new_distance
+            camera.position[:] = (bx - ax * anchor_scale, by - ay * anchor_scale, bz - az * anchor_scale)
+
+
+def _orbit_planetary_camera(camera, planetary_body, axis, angle):
+    """Move the camera along a great circle around the body and update planetary_up to match"""
+    relative_pos = camera.position - planetary_body.position
+    new_relative_pos = _rotate_vector_around_axis(relative_pos, axis, angle)
+    camera.position = planetary_body.position + new_relative_pos
+    
+    # CRITICAL FIX: Only update planetary_up, NOT planetary_right
+    # planetary_right should remain stable to prevent coordinate system flipping
+    # The new surface normal is the rotated offset itself, so it needs no second pass over the position
+    norm = _norm3(new_relative_pos)
+    if norm > 0:
+        camera.planetary_up = new_relative_pos / norm
 
 
 def _rotation_matrix_from_axis_angle(axis, angle):
     """Create rotation matrix from axis and angle using Rodrigues' formula"""
-    axis = axis / np.linalg.norm(axis)  # Ensure axis is normalized
-    cos_angle = np.cos(angle)
-    sin_angle = np.sin(angle)
+    # Ensure axis is normalized
+    ax, ay, az = axis[0], axis[1], axis[2]
+    length = math.sqrt(ax * ax + ay * ay + az * az)
+    if length > 0:
+        ax, ay, az = ax / length, ay / length, az / length
+    cos_angle = math.cos(angle)
+    sin_angle = math.sin(angle)
     
     # Rodrigues' rotation formula in matrix form
-    # R = I*cos(θ) + (1-cos(θ))*aa^T + sin(θ)*[a]_x
-    axis_outer = np.outer(axis, axis)
-    axis_cross = np.array([
-        [0, -axis[2], axis[1]],
-        [axis[2], 0, -axis[0]],
-        [-axis[1], axis[0], 0]
-    ])
-    
-    rotation_matrix = (np.eye(3) * cos_angle + 
-                      axis_outer * (1 - cos_angle) + 
-                      axis_cross * sin_angle)
+    # R = I*cos(θ) + (1-cos(θ))*aa^T + sin(θ)*[a]_x, assembled entry by entry;
+    # aa^T is symmetric, so each off-diagonal product is computed once
+    t = 1 - cos_angle
+    txy = ax * ay * t
+    txz = ax * az * t
+    tyz = ay * az * t
+    sx = ax * sin_angle
+    sy = ay * sin_angle
+    sz = az * sin_angle
+    rotation_matrix = np.empty((3, 3))
+    rotation_matrix[0, 0] = cos_angle + ax * ax * t
+    rotation_matrix[0, 1] = txy - sz
+    rotation_matrix[0, 2] = txz + sy
+    rotation_matrix[1, 0] = txy + sz
+    rotation_matrix[1, 1] = cos_angle + ay * ay * t
+    rotation_matrix[1, 2] = tyz - sx
+    rotation_matrix[2, 0] = txz - sy
+    rotation_matrix[2, 1] = tyz + sx
+    rotation_matrix[2, 2] = cos_angle + az * az * t
     
     return rotation_matrix
 
 
+if NUMBA_AVAILABLE:
+    _rotation_matrix_from_axis_angle = njit(cache=True)(_rotation_matrix_from_axis_angle)
+
+
 def handle_camera_input(camera, keys, movement_speed_multiplier=1.0):
     """Handle camera control input using vector-based rotation"""
-    # Rotation using vector methods
-    if keys[K_LEFT]:
-        camera.rotate_yaw(-0.02)  # Yaw around world up
-    if keys[K_RIGHT]:
-        camera.rotate_yaw(0.02)
-    if keys[K_UP]:
-        camera.rotate_pitch(-0.02)  # Pitch around local right
-    if keys[K_DOWN]:
-        camera.rotate_pitch(0.02)
-    
-    # Pan camera (WASD) with speed multiplier
-    if keys[K_w]:
-        camera.move('up', movement_speed_multiplier)
-    if keys[K_s]:
-        camera.move('down', movement_speed_multiplier)
-    if keys[K_a]:
-        camera.move('left', movement_speed_multiplier)
-    if keys[K_d]:
-        camera.move('right', movement_speed_multiplier)
-    
-    # Zoom (Q/E) with speed multiplier
-    if keys[K_q]:
-        camera.move('backward', movement_speed_multiplier)
-    if keys[K_e]:
-        camera.move('forward', movement_speed_multiplier)
+    # Rotation using vector methods; opposite keys cancel, so each axis rotates at most once
+    yaw = keys[K_RIGHT] - keys[K_LEFT]
+    if yaw:
+        camera.rotate_yaw(0.02 * yaw)  # Yaw around world up
+    pitch = keys[K_DOWN] - keys[K_UP]
+    if pitch:
+        camera.rotate_pitch(0.02 * pitch)  # Pitch around local right
+    
+    # Pan (WASD) and zoom (Q/E) combined into a single move with speed multiplier
+    right = keys[K_d] - keys[K_a]
+    up = keys[K_w] - keys[K_s]
+    forward = keys[K_e] - keys[K_q]
+    if right or up or forward:
+        camera.move_along_axes(right, up, forward, movement_speed_multiplier)
@@ -1,17 +1,54 @@
 import numpy as np
 
+try:
+    from numba import njit, prange, get_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional; the NumPy kernels below are used without it
+    NUMBA_AVAILABLE = False
+
+try:
+    import warp as wp
+    WARP_AVAILABLE = True
+except ImportError:
+    # Warp is optional; it's only needed for the --gpu integrator
+    WARP_AVAILABLE = False
+
 # Physics constants
 G = 6.67430e-11  # Gravitational constant (scaled for simulation)
 SCALE = 1e9  # Scale factor for distances
-DT = 86400  # Time step (1 day in seconds)
+DT = 86400  # Simulated time per frame at 1x (1 day in seconds)
 FPS = 60
 
+# Fixed integration sub-step; each frame's DT * time_multiplier is covered by several of these
+PHYSICS_DT = 3600  # 1 hour in seconds
+MAX_SUBSTEPS = 48  # Sub-steps per frame before the step is stretched instead
+
 # Default time multiplier
 TIME_MULTIPLIER = 1.0
 
+# Barnes-Hut settings. The octree is built and walked in NumPy, so it only overtakes the NumPy
+# all-pairs kernel (whose N×N scratch also runs to gigabytes) at several thousand bodies; the
+# compiled all-pairs kernel stays several times faster than it at any size that runs interactively
+BARNES_HUT_THRESHOLD = 6000  # Body count above which the octree replaces the NumPy all-pairs kernel
+BARNES_HUT_THETA = 0.5  # Opening angle: cell width / distance below which a cell is approximated
+OCTREE_MAX_DEPTH = 32  # Coincident bodies share a leaf past this depth
+
+# Body count from which the compiled kernel spreads rows over threads. The threaded kernel sums
+# every pair twice (one row per thread, no shared writes), so it needs more than two threads
+# and enough bodies to amortise thread start-up before it beats the serial pair-once kernel
+PARALLEL_THRESHOLD = 1024
+
+# Trail settings
+TRAIL_LENGTH = 100  # Fixed maximum trail length (points per body)
+TRAIL_DISTANCE_THRESHOLD = 5e9  # Distance threshold for new trail points
+
+# Octant offsets, indexed by (x > cx) | (y > cy) << 1 | (z > cz) << 2
+_OCTANT_SIGNS = np.array([[(o & 1) * 2 - 1, ((o >> 1) & 1) * 2 - 1, ((o >> 2) & 1) * 2 - 1] for o in range(8)], dtype=float)
+
 
 class Body:
-    def __init__(self, name, mass, position, velocity, radius, color, inclination=0.0):
+    def __init__(self, name, mass, position, velocity, radius, color, inclination=0.0, inclined=False):
         self.name = name
         self.mass = mass
         self.position = np.array(position, dtype=float)  # [x, y, z]
@@ -19,12 +56,10 @@ class Body:
         self.radius = radius
         self.color = color
         self.inclination = inclination  # Orbital inclination in radians
-        self.trail = []
-        self.max_trail_length = 100  # Fixed maximum trail length
-        self.trail_distance_threshold = 5e9  # Distance threshold for new trail points
         
-        # Apply inclination to initial position and velocity
-        self._apply_inclination()
+        # Apply inclination to initial position and velocity (unless the caller already did)
+        if not inclined:
+            self._apply_inclination()
     
     def _apply_inclination(self):
         """Apply orbital inclination to position and velocity"""
@@ -44,81 +79,411 @@ class Body:
             vz = self.velocity[1] * sin_i + self.velocity[2] * cos_i
             self.velocity[1] = vy
             self.velocity[2] = vz
+
+
+def incline_states(positions, velocities, inclinations):
+    """Rotate packed positions and velocities about the x-axis by per-body inclinations (radians), in place"""
+    cos_i = np.cos(inclinations)
+    sin_i = np.sin(inclinations)
+    for state in (positions, velocities):
+        y = state[:, 1] * cos_i - state[:, 2] * sin_i
+        state[:, 2] = state[:, 1] * sin_i + state[:, 2] * cos_i
+        state[:, 1] = y
+
+
+def pack_bodies(bodies):
+    """Pack body state into contiguous SoA arrays, leaving each body with views into them"""
+    positions = np.array([body.position for body in bodies], dtype=float).reshape(-1, 3)
+    velocities = np.array([body.velocity for body in bodies], dtype=float).reshape(-1, 3)
+    masses = np.array([body.mass for body in bodies], dtype=float)
     
-    def update_position(self, acceleration):
-        self.velocity += acceleration * DT
-        self.position += self.velocity * DT
-        
-        # Store trail
-        self.trail.append(self.position.copy())
-        if len(self.trail) > self.max_trail:
-            self.trail.pop(0)
+    # Rebind body vectors as row views so camera/render code sees the same state
+    for i, body in enumerate(bodies):
+        body.position = positions[i]
+        body.velocity = velocities[i]
+    
+    return positions, velocities, masses
+
+
+if NUMBA_AVAILABLE:
+    # Serial: visiting each pair once (Newton's third law) halves the work, and for small
+    # systems thread start-up costs more than the whole pair loop
+    @njit(fastmath=True, cache=True)
+    def _accel(pos, mass, out, g, eps2):
+        """Compiled all-pairs gravity kernel writing accelerations into out"""
+        n = pos.shape[0]
+        out[:] = 0.0
+        for i in range(n):
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            for j in range(i + 1, n):
+                dx = pos[j, 0] - pos[i, 0]
+                dy = pos[j, 1] - pos[i, 1]
+                dz = pos[j, 2] - pos[i, 2]
+                d2 = dx * dx + dy * dy + dz * dz + eps2
+                
+                # Coincident pairs contribute no force
+                if d2 > 0.0:
+                    # Equal and opposite: each side scales the shared g/d³ by the other's mass
+                    s = g * d2 ** -1.5
+                    si = s * mass[j]
+                    sj = s * mass[i]
+                    ax += si * dx
+                    ay += si * dy
+                    az += si * dz
+                    out[j, 0] -= sj * dx
+                    out[j, 1] -= sj * dy
+                    out[j, 2] -= sj * dz
+            out[i, 0] += ax
+            out[i, 1] += ay
+            out[i, 2] += az
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _accel_parallel(pos, mass, out, g, eps2):
+        """Threaded all-pairs gravity kernel for large systems, one row of out per body"""
+        n = pos.shape[0]
+        for i in prange(n):
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            for j in range(n):
+                dx = pos[j, 0] - pos[i, 0]
+                dy = pos[j, 1] - pos[i, 1]
+                dz = pos[j, 2] - pos[i, 2]
+                d2 = dx * dx + dy * dy + dz * dz + eps2
+                
+                # Coincident pairs (including self-interaction) contribute no force
+                if d2 > 0.0:
+                    s = g * mass[j] * d2 ** -1.5
+                    ax += s * dx
+                    ay += s * dy
+                    az += s * dz
+            out[i, 0] = ax
+            out[i, 1] = ay
+            out[i, 2] = az
+
 
+# Per-frame scratch buffers, reallocated only when the body count changes
+_accel_out = np.empty((0, 3))
+_pair_r = np.empty((0, 0, 3))
+_pair_d2 = np.empty((0, 0))
+_pair_inv_d3 = np.empty((0, 0))
 
-def calculate_gravity(body1, body2):
-    """Calculate gravitational force between two bodies"""
-    r_vec = body2.position - body1.position
-    distance = np.linalg.norm(r_vec)
+
+def _ensure_scratch(n):
+    """(Re)allocate the scratch buffers for n bodies if their size changed"""
+    global _accel_out, _pair_r, _pair_d2, _pair_inv_d3
+    if _accel_out.shape[0] != n:
+        _accel_out = np.empty((n, 3))
+    if not NUMBA_AVAILABLE and _pair_d2.shape[0] != n:
+        # Only the NumPy kernel needs the N×N pair buffers
+        _pair_r = np.empty((n, n, 3))
+        _pair_d2 = np.empty((n, n))
+        _pair_inv_d3 = np.empty((n, n))
+
+
+def calculate_accelerations(positions, masses):
+    """Calculate gravitational acceleration on every body from all others at once
     
-    if distance == 0:
-        return np.array([0.0, 0.0, 0.0])
+    The result is written into a reused module buffer, valid until the next call.
+    """
+    _ensure_scratch(len(masses))
     
-    # Gravitational force magnitude
-    force_mag = G * body1.mass * body2.mass / (distance ** 2)
+    if NUMBA_AVAILABLE:
+        if len(masses) >= PARALLEL_THRESHOLD and get_num_threads() > 2:
+            _accel_parallel(positions, masses, _accel_out, G, 0.0)
+        else:
+            _accel(positions, masses, _accel_out, G, 0.0)
+        return _accel_out
     
-    # Force direction (unit vector)
-    force_dir = r_vec / distance
+    # Pairwise separation vectors r[i, j] = position[j] - position[i]
+    np.subtract(positions[np.newaxis, :, :], positions[:, np.newaxis, :], out=_pair_r)
+    np.einsum('ijk,ijk->ij', _pair_r, _pair_r, out=_pair_d2)
     
-    # Force vector
-    force = force_mag * force_dir
+    # 1/d³ with coincident pairs (including self-interaction) contributing no force
+    _pair_inv_d3.fill(0.0)
+    np.power(_pair_d2, -1.5, out=_pair_inv_d3, where=_pair_d2 > 0)
     
-    return force
+    # a_i = G * sum_j m_j * r_ij / |r_ij|³
+    np.multiply(_pair_inv_d3, G * masses[np.newaxis, :], out=_pair_inv_d3)
+    np.einsum('ij,ijk->ik', _pair_inv_d3, _pair_r, out=_accel_out)
+    return _accel_out
 
 
-def update_physics(bodies, time_multiplier=1.0):
-    """Update physics for all bodies with time multiplier"""
-    effective_dt = DT * time_multiplier
+class Octree:
+    """Barnes-Hut octree stored as flat per-node arrays"""
+    
+    def __init__(self, positions, masses):
+        self.node_com = []  # Center of mass of each cell
+        self.node_mass = []  # Total mass of each cell
+        self.node_width = []  # Edge length of each cell
+        self.node_child = []  # Child node indices per octant (-1 if empty)
+        self.node_start = []  # Leaf cells: first slot in body_order
+        self.node_count = []  # Leaf cells: number of bodies (0 for internal cells)
+        self.body_order = []  # Body indices grouped by leaf
+        
+        if len(masses) > 0:
+            lower = positions.min(axis=0)
+            upper = positions.max(axis=0)
+            width = float((upper - lower).max()) or 1.0
+            self._build(np.arange(len(masses)), (lower + upper) / 2, width, positions, masses, 0)
+        
+        # Freeze into arrays for vectorized traversal
+        self.node_com = np.array(self.node_com, dtype=float).reshape(-1, 3)
+        self.node_mass = np.array(self.node_mass, dtype=float)
+        self.node_width = np.array(self.node_width, dtype=float)
+        self.node_child = np.array(self.node_child, dtype=int).reshape(-1, 8)
+        self.node_start = np.array(self.node_start, dtype=int)
+        self.node_count = np.array(self.node_count, dtype=int)
+        self.body_order = np.array(self.body_order, dtype=int)
     
-    for body in bodies:
-        net_force = np.array([0.0, 0.0, 0.0])
+    def _build(self, indices, center, width, positions, masses, depth):
+        """Recursively insert bodies into the cell at center and return its node index"""
+        node = len(self.node_mass)
+        cell_masses = masses[indices]
+        total_mass = cell_masses.sum()
+        if len(indices) == 1:
+            # Exact position so a body never feels its own leaf
+            com = positions[indices[0]]
+        elif total_mass > 0:
+            com = (positions[indices] * cell_masses[:, np.newaxis]).sum(axis=0) / total_mass
+        else:
+            com = center
         
-        for other in bodies:
-            if body != other:
-                force = calculate_gravity(body, other)
-                net_force += force
+        self.node_com.append(com)
+        self.node_mass.append(total_mass)
+        self.node_width.append(width)
+        self.node_child.append([-1] * 8)
         
-        # Calculate acceleration (F = ma)
-        acceleration = net_force / body.mass
+        if len(indices) == 1 or depth >= OCTREE_MAX_DEPTH:
+            # Leaf: record which bodies live here
+            self.node_start.append(len(self.body_order))
+            self.node_count.append(len(indices))
+            self.body_order.extend(indices.tolist())
+            return node
         
-        # Update with effective time step
-        body.velocity += acceleration * effective_dt
-        body.position += body.velocity * effective_dt
+        self.node_start.append(0)
+        self.node_count.append(0)
         
-        # Distance-based trail generation with intermediate points
-        if len(body.trail) == 0:
-            # First trail point
-            body.trail.append(body.position.copy())
-        else:
-            # Check distance from last trail point
-            last_point = body.trail[-1]
-            distance = np.linalg.norm(body.position - last_point)
+        # Split bodies into octants and recurse into the non-empty ones
+        above = positions[indices] > center
+        octants = above[:, 0] | (above[:, 1] << 1) | (above[:, 2] << 2)
+        for octant in range(8):
+            sub_indices = indices[octants == octant]
+            if len(sub_indices) > 0:
+                child_center = center + _OCTANT_SIGNS[octant] * (width / 4)
+                self.node_child[node][octant] = self._build(sub_indices, child_center, width / 2, positions, masses, depth + 1)
+        
+        return node
+
+
+def _accumulate_gravity(acceleration, targets, source_positions, source_masses, positions):
+    """Add G*m*r/|r|³ from each source onto its paired target, skipping coincident pairs"""
+    r = source_positions - positions[targets]
+    d2 = np.einsum('ij,ij->i', r, r)
+    inv_d3 = np.zeros_like(d2)
+    np.power(d2, -1.5, out=inv_d3, where=d2 > 0)
+    np.add.at(acceleration, targets, G * (source_masses * inv_d3)[:, np.newaxis] * r)
+
+
+def calculate_accelerations_barnes_hut(positions, masses, theta=BARNES_HUT_THETA):
+    """Approximate gravitational accelerations with a Barnes-Hut octree in O(N log N)"""
+    tree = Octree(positions, masses)
+    acceleration = np.zeros_like(positions)
+    
+    # Walk the tree for all bodies at once, one level per iteration, as (target body, node) pairs
+    targets = np.arange(len(masses))
+    nodes = np.zeros(len(masses), dtype=int)
+    
+    while targets.size > 0:
+        r = tree.node_com[nodes] - positions[targets]
+        d2 = np.einsum('ij,ij->i', r, r)
+        counts = tree.node_count[nodes]
+        
+        # Single-body leaves and cells far enough away act as one pseudo-particle
+        accept = (counts == 1) | ((counts == 0) & (tree.node_width[nodes] ** 2 < theta * theta * d2))
+        _accumulate_gravity(acceleration, targets[accept], tree.node_com[nodes[accept]], tree.node_mass[nodes[accept]], positions)
+        
+        # Leaves holding coincident bodies are summed directly body by body
+        shared = counts > 1
+        if shared.any():
+            leaf_counts = counts[shared]
+            pair_targets = np.repeat(targets[shared], leaf_counts)
+            offsets = np.arange(leaf_counts.sum()) - np.repeat(np.cumsum(leaf_counts) - leaf_counts, leaf_counts)
+            sources = tree.body_order[np.repeat(tree.node_start[nodes[shared]], leaf_counts) + offsets]
+            _accumulate_gravity(acceleration, pair_targets, positions[sources], masses[sources], positions)
+        
+        # Open the remaining cells into their non-empty children
+        opened = ~accept & (counts == 0)
+        children = tree.node_child[nodes[opened]]
+        present = children >= 0
+        targets = np.repeat(targets[opened], present.sum(axis=1))
+        nodes = children[present]
+    
+    return acceleration
+
+
+def integrate(positions, velocities, masses, dt):
+    """Advance the packed body state by one kick-drift step of dt seconds"""
+    if not NUMBA_AVAILABLE and len(masses) > BARNES_HUT_THRESHOLD:
+        acceleration = calculate_accelerations_barnes_hut(positions, masses)
+    else:
+        acceleration = calculate_accelerations(positions, masses)
+    acceleration *= dt
+    velocities += acceleration
+    
+    # Reuse the acceleration buffer for the drift step
+    np.multiply(velocities, dt, out=acceleration)
+    positions += acceleration
+
+
+def _split_substeps(sim_time):
+    """Split sim_time into (steps, step_dt, leftover) fixed sub-steps"""
+    steps = int(sim_time // PHYSICS_DT)
+    if steps > MAX_SUBSTEPS:
+        # Too much time for one frame: stretch the step rather than fall behind
+        return MAX_SUBSTEPS, sim_time / MAX_SUBSTEPS, 0.0
+    return steps, PHYSICS_DT, sim_time - steps * PHYSICS_DT
+
+
+def advance_physics(positions, velocities, masses, trails, sim_time):
+    """Advance the simulation by sim_time seconds in fixed PHYSICS_DT sub-steps
+    
+    trails may be None to skip trail recording; reset the buffer before recording again.
+    Returns the leftover time (less than one sub-step) to carry into the next frame.
+    """
+    steps, step_dt, leftover = _split_substeps(sim_time)
+    
+    for _ in range(steps):
+        integrate(positions, velocities, masses, step_dt)
+    
+    # Trails only need the state once per frame
+    if steps > 0 and trails is not None:
+        trails.update(positions)
+    
+    return leftover
+
+
+if WARP_AVAILABLE:
+    @wp.kernel
+    def _warp_accel(pos: wp.array(dtype=wp.vec3d), mass: wp.array(dtype=wp.float64), g: wp.float64, out: wp.array(dtype=wp.vec3d)):
+        """All-pairs gravity on the device, one thread per body"""
+        i = wp.tid()
+        a = wp.vec3d()
+        for j in range(pos.shape[0]):
+            r = pos[j] - pos[i]
+            d2 = wp.dot(r, r)
             
-            if distance >= body.trail_distance_threshold:
-                # Add intermediate points if distance is very large
-                remaining_distance = distance
-                direction = (body.position - last_point) / distance  # Unit vector
-                
-                while remaining_distance >= body.trail_distance_threshold:
-                    # Add point at threshold distance along the path
-                    intermediate_point = last_point + direction * body.trail_distance_threshold
-                    body.trail.append(intermediate_point)
-                    last_point = intermediate_point
-                    remaining_distance -= body.trail_distance_threshold
-                
-                # Add final point if there's remaining distance
-                if remaining_distance > 0:
-                    body.trail.append(body.position.copy())
+            # Coincident pairs (including self-interaction) contribute no force
+            if d2 > wp.float64(0.0):
+                a += r * (g * mass[j] / (d2 * wp.sqrt(d2)))
+        out[i] = a
+    
+    @wp.kernel
+    def _warp_kick_drift(pos: wp.array(dtype=wp.vec3d), vel: wp.array(dtype=wp.vec3d), acc: wp.array(dtype=wp.vec3d), dt: wp.float64):
+        """Kick-drift step matching integrate()"""
+        i = wp.tid()
+        v = vel[i] + acc[i] * dt
+        vel[i] = v
+        pos[i] = pos[i] + v * dt
+
+
+class GPUIntegrator:
+    """Keeps the packed body state on a Warp device and integrates it there
+    
+    The host positions array is refreshed once per advance() for rendering. Host velocities
+    are only refreshed on demand through download_velocities(), so host code that reads them
+    (the hover panel, saving) must download first.
+    """
+    
+    def __init__(self, positions, velocities, masses, device=None):
+        if not WARP_AVAILABLE:
+            raise RuntimeError("GPU integration requires Warp (pip install warp-lang)")
+        self.device = wp.get_device(device)
+        self.n = len(masses)
+        self.positions = wp.array(positions, dtype=wp.vec3d, device=self.device)
+        self.velocities = wp.array(velocities, dtype=wp.vec3d, device=self.device)
+        self.masses = wp.array(masses, dtype=wp.float64, device=self.device)
+        self.accelerations = wp.zeros(self.n, dtype=wp.vec3d, device=self.device)
+    
+    def advance(self, positions, trails, sim_time):
+        """Device counterpart of advance_physics, writing the new positions into the host array"""
+        steps, step_dt, leftover = _split_substeps(sim_time)
+        if steps == 0:
+            return leftover
+        
+        for _ in range(steps):
+            wp.launch(_warp_accel, dim=self.n, inputs=[self.positions, self.masses, G, self.accelerations], device=self.device)
+            wp.launch(_warp_kick_drift, dim=self.n, inputs=[self.positions, self.velocities, self.accelerations, float(step_dt)], device=self.device)
+        
+        # Single download per frame for rendering, hover and trails
+        np.copyto(positions, self.positions.numpy())
+        if trails is not None:
+            trails.update(positions)
+        
+        return leftover
+    
+    def download_velocities(self, velocities):
+        """Copy the device velocities into the host array"""
+        np.copyto(velocities, self.velocities.numpy())
+
+
+class TrailBuffer:
+    """Ring buffer of the most recent trail points for every body
+    
+    Points live in one (N, TRAIL_LENGTH, 3) float32 array; head[i] is the next slot body i
+    writes to and count[i] how many slots hold points.
+    """
+    
+    def __init__(self, positions, length=TRAIL_LENGTH, distance_threshold=TRAIL_DISTANCE_THRESHOLD):
+        n = len(positions)
+        self.length = length
+        self.distance_threshold = distance_threshold
+        self.points = np.zeros((n, length, 3), dtype=np.float32)
+        self.reset(positions)
+    
+    def reset(self, positions):
+        """Restart every trail at the given positions, dropping the recorded points"""
+        n = len(positions)
+        self.last = np.array(positions, dtype=float).reshape(-1, 3)  # Newest point, kept in full precision
+        self.head = np.ones(n, dtype=int) % self.length
+        self.count = np.ones(n, dtype=int)
+        
+        # Trails start at the given positions
+        self.points[:, 0] = self.last
+    
+    def update(self, positions):
+        """Distance-based trail generation with intermediate points"""
+        delta = positions - self.last
+        distance = np.sqrt(np.einsum('ij,ij->i', delta, delta))
         
-        # Maintain fixed trail length
-        while len(body.trail) > body.max_trail_length:
-            body.trail.pop(0)
+        # A body that moved past the threshold gets a point every threshold along the path,
+        # plus its current position if there's remaining distance
+        moved = distance >= self.distance_threshold
+        if not moved.any():
+            return
+        full_steps = np.where(moved, np.floor(distance / self.distance_threshold), 0).astype(int)
+        new_points = full_steps + (moved & (distance > full_steps * self.distance_threshold))
+        
+        # Only the newest `length` points per body can survive, so skip generating the rest
+        kept = np.minimum(new_points, self.length)
+        skipped = new_points - kept
+        
+        # Flatten (body, point) pairs: point k of body i sits min((skipped + k + 1) * threshold, distance) along the path
+        body_index = np.repeat(np.arange(len(kept)), kept)
+        k = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+        along = np.minimum((skipped[body_index] + k + 1) * self.distance_threshold, distance[body_index])
+        direction = delta[body_index] / distance[body_index, np.newaxis]
+        self.points[body_index, (self.head[body_index] + k) % self.length] = self.last[body_index] + direction * along[:, np.newaxis]
+        
+        self.head = (self.head + kept) % self.length
+        self.count = np.minimum(self.count + kept, self.length)
+        self.last[moved] = positions[moved]
+    
+    def get_trail(self, i):
+        """Body i's trail points, oldest first"""
+        if self.count[i] < self.length:
+            return self.points[i, :self.count[i]]
+        head = self.head[i]
+        return np.concatenate((self.points[i, head:], self.points[i, :head]))
@@ -1,6 +1,14 @@
 import json
 import numpy as np
-from scripts.physics import Body
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # orjson is optional; the standard json module parses the same files
+    ORJSON_AVAILABLE = False
+
+from scripts.physics import Body, incline_states
 from scripts.visuals import SUN_COLOR, MERCURY_COLOR, VENUS_COLOR, EARTH_COLOR, MARS_COLOR, JUPITER_COLOR, SATURN_COLOR, URANUS_COLOR, NEPTUNE_COLOR, PLUTO_COLOR
 
 # Color mapping for predefined bodies
@@ -17,6 +25,36 @@ COLOR_MAP = {
     "Pluto": PLUTO_COLOR
 }
 
+# Default solar system: (name, mass, position, velocity, radius, color, inclination in degrees)
+DEFAULT_DISTANCE_SCALE = 1e8
+DEFAULT_BODIES = (
+    # Sun (massive for visual impact)
+    ("Sun", 1.989e30, (0, 0, 0), (0, 0, 0), 80, SUN_COLOR, 0.0),
+    
+    # Inner planets with orbital inclinations
+    ("Mercury", 3.301e23, (5.79e10, 0, 0), (0, 0, 47870), 15, MERCURY_COLOR, 7.0),
+    ("Venus", 4.867e24, (1.082e11, 0, 0), (0, 0, 35020), 25, VENUS_COLOR, 3.4),
+    ("Earth", 5.972e24, (1.496e11, 0, 0), (0, 0, 29780), 30, EARTH_COLOR, 0.0),
+    ("Mars", 6.39e23, (2.279e11, 0, 0), (0, 0, 24070), 20, MARS_COLOR, 1.9),
+    
+    # Gas giants with orbital inclinations
+    ("Jupiter", 1.898e27, (7.785e11, 0, 0), (0, 0, 13070), 60, JUPITER_COLOR, 1.3),
+    ("Saturn", 5.683e26, (1.434e12, 0, 0), (0, 0, 9680), 50, SATURN_COLOR, 2.5),
+    
+    # Ice giants with orbital inclinations
+    ("Uranus", 8.681e25, (2.873e12, 0, 0), (0, 0, 6800), 35, URANUS_COLOR, 0.8),
+    ("Neptune", 1.024e26, (4.495e12, 0, 0), (0, 0, 5430), 33, NEPTUNE_COLOR, 1.8),
+    
+    # Dwarf planet with highly inclined orbit
+    ("Pluto", 1.309e22, (5.906e12, 0, 0), (0, 0, 4740), 10, PLUTO_COLOR, 17.2)
+)
+
+# Inclinations converted to radians, and folded into the initial state, once at import
+DEFAULT_INCLINATIONS = np.radians([params[-1] for params in DEFAULT_BODIES]).tolist()
+DEFAULT_POSITIONS = np.array([params[2] for params in DEFAULT_BODIES], dtype=float)
+DEFAULT_VELOCITIES = np.array([params[3] for params in DEFAULT_BODIES], dtype=float)
+incline_states(DEFAULT_POSITIONS, DEFAULT_VELOCITIES, DEFAULT_INCLINATIONS)
+
 def parse_color(color_data):
     """Parse color from JSON data (hex string, rgb array, or color name)"""
     if isinstance(color_data, str):
@@ -38,8 +76,12 @@ def parse_color(color_data):
 def load_solar_system(file_path="system.json"):
     """Load solar system configuration from JSON file"""
     try:
-        with open(file_path, 'r') as f:
-            config = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(file_path, 'rb') as f:
+                config = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r') as f:
+                config = json.load(f)
         
         bodies = []
         
@@ -47,13 +89,20 @@ def load_solar_system(file_path="system.json"):
         distance_scale = config.get("distance_scale", 1e8)
         default_color = config.get("default_color", [255, 255, 255])
         
+        # Convert every body's state in one call instead of one array per vector
+        body_list = config.get("bodies", [])
+        positions = np.array([body_data["position"] for body_data in body_list], dtype=float).reshape(-1, 3)
+        velocities = np.array([body_data["velocity"] for body_data in body_list], dtype=float).reshape(-1, 3)
+        
+        # Optional inclinations (degrees), applied to the whole system at once
+        inclinations = np.radians(np.array([body_data.get("inclination", 0) for body_data in body_list], dtype=float))
+        incline_states(positions, velocities, inclinations)
+        
         # Load bodies
-        for body_data in config.get("bodies", []):
+        for body_data, position, velocity, inclination in zip(body_list, positions, velocities, inclinations.tolist()):
             # Required fields
             name = body_data["name"]
             mass = body_data["mass"]
-            position = np.array(body_data["position"])
-            velocity = np.array(body_data["velocity"])
             radius = body_data.get("radius", 10) * distance_scale
             
             # Color (with fallback)
@@ -64,13 +113,8 @@ def load_solar_system(file_path="system.json"):
                 print(f"Warning: Invalid color for {name}, using default")
                 color = parse_color(default_color)
             
-            # Optional inclination
-            inclination = body_data.get("inclination", 0)
-            if isinstance(inclination, (int, float)):
-                inclination = np.radians(inclination)
-            
-            # Create body
-            body = Body(name, mass, position, velocity, radius, color, inclination)
+            # Create body (its state is already inclined)
+            body = Body(name, mass, position, velocity, radius, color, inclination, inclined=True)
             bodies.append(body)
         
         print(f"Loaded {len(bodies)} bodies from {file_path}")
@@ -91,28 +135,10 @@ def load_solar_system(file_path="system.json"):
 
 def create_default_solar_system():
     """Create the default solar system as fallback"""
-    distance_scale = 1e8
-    
     return [
-        # Sun (massive for visual impact)
-        Body("Sun", 1.989e30, [0, 0, 0], [0, 0, 0], 80 * distance_scale, SUN_COLOR),
-        
-        # Inner planets with orbital inclinations
-        Body("Mercury", 3.301e23, [5.79e10, 0, 0], [0, 0, 47870], 15 * distance_scale, MERCURY_COLOR, inclination=np.radians(7.0)),
-        Body("Venus", 4.867e24, [1.082e11, 0, 0], [0, 0, 35020], 25 * distance_scale, VENUS_COLOR, inclination=np.radians(3.4)),
-        Body("Earth", 5.972e24, [1.496e11, 0, 0], [0, 0, 29780], 30 * distance_scale, EARTH_COLOR, inclination=np.radians(0.0)),
-        Body("Mars", 6.39e23, [2.279e11, 0, 0], [0, 0, 24070], 20 * distance_scale, MARS_COLOR, inclination=np.radians(1.9)),
-        
-        # Gas giants with orbital inclinations
-        Body("Jupiter", 1.898e27, [7.785e11, 0, 0], [0, 0, 13070], 60 * distance_scale, JUPITER_COLOR, inclination=np.radians(1.3)),
-        Body("Saturn", 5.683e26, [1.434e12, 0, 0], [0, 0, 9680], 50 * distance_scale, SATURN_COLOR, inclination=np.radians(2.5)),
-        
-        # Ice giants with orbital inclinations
-        Body("Uranus", 8.681e25, [2.873e12, 0, 0], [0, 0, 6800], 35 * distance_scale, URANUS_COLOR, inclination=np.radians(0.8)),
-        Body("Neptune", 1.024e26, [4.495e12, 0, 0], [0, 0, 5430], 33 * distance_scale, NEPTUNE_COLOR, inclination=np.radians(1.8)),
-        
-        # Dwarf planet with highly inclined orbit
-        Body("Pluto", 1.309e22, [5.906e12, 0, 0], [0, 0, 4740], 10 * distance_scale, PLUTO_COLOR, inclination=np.radians(17.2))
+        Body(name, mass, position, velocity, radius * DEFAULT_DISTANCE_SCALE, color, inclination, inclined=True)
+        for (name, mass, _, _, radius, color, _), position, velocity, inclination
+        in zip(DEFAULT_BODIES, DEFAULT_POSITIONS, DEFAULT_VELOCITIES, DEFAULT_INCLINATIONS)
     ]
 
 def save_solar_system(bodies, file_path="system.json"):
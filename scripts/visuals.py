@@ -1,6 +1,8 @@
+import functools
+import math
 import pygame
 import numpy as np
-from scripts.camera import Camera, project_3d_to_2d, check_hover, get_planetary_coordinates
+from scripts.camera import Camera, project_3d_to_2d, project_points_3d_to_2d, check_hover, get_planetary_coordinates
 
 # Visual constants
 BLACK = (0, 0, 0)
@@ -21,21 +23,67 @@ PLUTO_COLOR = (200, 180, 160)
 # Screen constants
 WIDTH, HEIGHT = 1000, 800
 
+# Key help lines at the top of the UI, which never change
+UI_INSTRUCTIONS = (
+    "ESC: Exit | SPACE: Pause/Resume",
+    "T: Toggle Trails | R: Reset",
+    "+/-: Speed Up/Slow Down Time (0.01x - 100x)",
+    "./,: Faster/Slower Movement (0.1x - 10x)",
+    "Arrow Keys: Rotate View",
+    "WASD: Move Camera (relative to view)",
+    "Q/E: Move Forward/Backward",
+    "L: Lock to hovered planet",
+    "P: Planetary mode (fixed distance)",
+)
 
-def render_scene(screen, bodies, camera, show_trails, show_ui, time_multiplier, movement_speed_multiplier, width, height, locked_body=None, planetary_body=None):
+# Fonts by size and the rendered UI_INSTRUCTIONS, created on first use (after pygame.init())
+_fonts = {}
+_instruction_surfaces = []
+
+
+def get_font(size):
+    """Default font at the given size, loaded once"""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+@functools.lru_cache(maxsize=256)
+def render_text(text, size):
+    """White text in the default font, re-rendered only when the string hasn't been seen recently"""
+    return get_font(size).render(text, True, WHITE)
+
+
+def render_scene(screen, bodies, camera, show_trails, show_ui, time_multiplier, movement_speed_multiplier, width, height, locked_body=None, planetary_body=None, mouse_pos=None, trails=None, render_positions=None, radii=None):
     """Render the entire scene"""
     screen.fill(BLACK)
     
+    # Submit all trail and body geometry under one surface lock, rather than
+    # letting every pygame.draw call lock and unlock the screen on its own
+    screen.lock()
+    
+    if render_positions is None:
+        # Drawing and hover only need screen precision, so project in single precision like main's render mirror
+        render_positions = np.array([body.position for body in bodies], dtype=np.float32).reshape(-1, 3)
+    
     # Draw trails
-    if show_trails:
-        draw_trails(screen, bodies, camera, width, height)
+    if show_trails and trails is not None:
+        draw_trails(screen, bodies, trails, camera, width, height, render_positions)
     
-    # Draw bodies
-    draw_bodies(screen, bodies, camera, width, height, planetary_body)
+    if radii is None:
+        radii = np.array([body.radius for body in bodies])
+    
+    # Draw bodies, keeping their projection for the hover test
+    projection = draw_bodies(screen, bodies, camera, width, height, planetary_body, render_positions, radii)
+    
+    # Text blits below need an unlocked surface
+    screen.unlock()
     
     # Draw hover information
-    mouse_pos = pygame.mouse.get_pos()
-    hovered_body = check_hover(mouse_pos, bodies, camera, width, height)
+    if mouse_pos is None:
+        mouse_pos = pygame.mouse.get_pos()
+    hovered_body = check_hover(mouse_pos, bodies, camera, width, height, render_positions, radii, projection)
     if hovered_body:
         draw_hover_info(screen, hovered_body, camera, width, height)
     
@@ -44,158 +92,138 @@ def render_scene(screen, bodies, camera, show_trails, show_ui, time_multiplier,
         draw_ui(screen, camera, show_trails, show_ui, time_multiplier, movement_speed_multiplier, width, height, locked_body, planetary_body)
 
 
-def draw_trails(screen, bodies, camera, width, height):
-    """Draw orbital trails for all bodies"""
-    for body in bodies:
-        trail_segments = []  # List of trail segments (each segment is a list of points)
-        current_segment = []
-        
-        # Process all trail points
-        for pos in body.trail:
-            proj_x, proj_y, cam_z, scale = project_3d_to_2d(pos, camera, width, height)
-            
-            # Skip if projection failed
-            if proj_x is None or proj_y is None or cam_z is None or scale is None:
-                # Point is behind camera or invalid - end current segment
-                if len(current_segment) > 1:
-                    trail_segments.append(current_segment)
-                current_segment = []
-                continue
-            
-            # Check if point is behind camera or invalid
-            if (not isinstance(proj_x, (int, float)) or not isinstance(proj_y, (int, float)) or 
-                cam_z <= 0 or proj_x < -100 or proj_x > width + 100 or 
-                proj_y < -100 or proj_y > height + 100):
-                # Point is behind camera or off-screen - end current segment
-                if len(current_segment) > 1:
-                    trail_segments.append(current_segment)
-                current_segment = []
-            else:
-                # Point is visible - add to current segment
-                current_segment.append((int(proj_x), int(proj_y)))
-        
-        # Add current position
-        current_proj_x, current_proj_y, current_cam_z, scale = project_3d_to_2d(body.position, camera, width, height)
-        
-        # Skip if projection failed
-        if current_proj_x is not None and current_proj_y is not None and current_cam_z is not None:
-            if (isinstance(current_proj_x, (int, float)) and isinstance(current_proj_y, (int, float)) and 
-                current_cam_z > 0 and -100 <= current_proj_x <= width + 100 and 
-                -100 <= current_proj_y <= height + 100):
-                current_segment.append((int(current_proj_x), int(current_proj_y)))
-        
-        # Add final segment if it has points
-        if len(current_segment) > 1:
-            trail_segments.append(current_segment)
-        
-        # Draw all trail segments
-        for segment in trail_segments:
-            if len(segment) > 1:
-                pygame.draw.lines(screen, body.color, False, segment, 1)
+def draw_trails(screen, bodies, trails, camera, width, height, positions=None):
+    """Draw orbital trails for all bodies
+    
+    Every trail, followed by its body's current position, is projected in one batch;
+    positions is the packed (N, 3) array of body positions, built from the bodies if omitted.
+    """
+    if positions is None:
+        positions = np.array([body.position for body in bodies]).reshape(-1, 3)
+    
+    # One point list for all bodies: each trail (oldest first) ends at the body's current position
+    chunks = []
+    for i in range(len(bodies)):
+        chunks.append(trails.get_trail(i))
+        chunks.append(positions[i:i + 1])
+    if not chunks:
+        return
+    points = np.concatenate(chunks).astype(positions.dtype, copy=False)
+    ends = np.cumsum([len(chunk) for chunk in chunks])[1::2]  # End of each body's points
+    
+    proj_x, proj_y, _, _, valid = project_points_3d_to_2d(points, camera, width, height)
+    
+    # Points that failed to project or are off-screen split a trail into separate segments
+    visible = valid & (proj_x >= -100) & (proj_x <= width + 100) & (proj_y >= -100) & (proj_y <= height + 100)
+    screen_points = np.stack((proj_x, proj_y), axis=1)
+    
+    # Runs of consecutive visible points for all bodies at once: a run starts at a visible point
+    # whose predecessor is hidden or another body's, and ends at one whose successor is
+    run_starts = visible.copy()
+    run_starts[1:] &= ~visible[:-1]
+    run_starts[ends[:-1]] = visible[ends[:-1]]
+    run_ends = visible.copy()
+    run_ends[:-1] &= ~visible[1:]
+    run_ends[ends - 1] = visible[ends - 1]
+    starts = np.flatnonzero(run_starts)
+    owners = np.searchsorted(ends, starts, side='right')  # Body each run belongs to
+    
+    # Draw all trail segments
+    for run_start, run_end, owner in zip(starts.tolist(), (np.flatnonzero(run_ends) + 1).tolist(), owners.tolist()):
+        if run_end - run_start > 1:
+            pygame.draw.lines(screen, bodies[owner].color, False, screen_points[run_start:run_end].tolist(), 1)
 
 
-def draw_bodies(screen, bodies, camera, width, height, planetary_body=None):
-    """Draw all celestial bodies with depth sorting"""
-    body_renders = []
-    
-    for body in bodies:
-        # In planetary mode, check if planetary body should be rendered
-        if planetary_body and body == planetary_body:
-            # CRITICAL FIX: Check if planetary body is behind the camera with 60° leeway
-            # Calculate if planet center is behind the camera
-            relative_pos = body.position - camera.position
-            # Normalize relative_pos to get proper direction vector
-            if np.linalg.norm(relative_pos) > 0:
-                relative_pos = relative_pos / np.linalg.norm(relative_pos)
-            forward = camera.get_forward_vector()
-            dot_product = np.dot(relative_pos, forward)
-            
-            # Only render if planet is in front of camera (dot_product >= 0)
-            if dot_product >= 0:
-                # Force planetary body to render last (on top) by using maximum depth
-                body_renders.append((0, body, 0, 0, 1))  # Always on top
-            # Skip rendering if planet is more than 45° behind camera
-        else:
-            # Normal rendering for other bodies
-            # Transform to camera space (translate)
-            relative_pos = body.position - camera.position
-            
-            # Transform to camera space using camera vectors
-            x, y, z = relative_pos
-            
-            # Get camera axes
-            right = camera.get_right_vector()
-            up = camera.get_up_vector()
-            forward = camera.get_forward_vector()
-            
-            # Transform to camera coordinates (dot products)
-            cam_x = np.dot(relative_pos, right)
-            cam_y = np.dot(relative_pos, up)
-            cam_z = np.dot(relative_pos, forward)
-            
-            proj_x, proj_y, _, scale = project_3d_to_2d(body.position, camera, width, height)
-            
-            # Skip if projection failed
-            if proj_x is None or proj_y is None or scale is None:
-                continue
-                
-            body_renders.append((cam_z, body, proj_x, proj_y, scale))
+def draw_bodies(screen, bodies, camera, width, height, planetary_body=None, positions=None, radii=None):
+    """Draw all celestial bodies with depth sorting
+    
+    positions is the packed (N, 3) array of body positions (e.g. a float32 render copy)
+    and radii the matching (N,) body radii; both are built from the bodies if omitted.
+    Returns the (in_front, proj_x, proj_y, scale, valid) arrays of the batched projection for hover_index.
+    """
+    if positions is None:
+        positions = np.array([body.position for body in bodies]).reshape(-1, 3)
+    if radii is None:
+        radii = np.array([body.radius for body in bodies])
+    
+    # Depths for all bodies at once; only those in front of the camera are projected
+    forward = camera.get_forward_vector().astype(positions.dtype, copy=False)
+    depths = (positions - camera.position.astype(positions.dtype, copy=False)) @ forward
+    in_front = np.flatnonzero(depths > 0)
+    proj_x, proj_y, _, scales, projected = project_points_3d_to_2d(positions[in_front], camera, width, height)
+    
+    # Bodies that project onto (or near) the screen, as positions within in_front
+    drawn = projected & (proj_x >= -100) & (proj_x <= width + 100) & (proj_y >= -100) & (proj_y <= height + 100)
+    
+    # In planetary mode, check if planetary body should be rendered
+    planetary_index = None
+    if planetary_body:
+        # It's drawn on its own below, not from the batch
+        planetary_index = bodies.index(planetary_body)
+        drawn &= in_front != planetary_index
     
-    # Sort by z-depth (furthest first)
-    body_renders.sort(key=lambda x: x[0], reverse=True)
+    # Sort by z-depth (furthest first); the stable sort keeps ties in body order
+    order = np.flatnonzero(drawn)
+    order = order[np.argsort(-depths[in_front[order]], kind='stable')]
+    
+    # Screen radii of the drawn bodies: whole pixels, but never below 1.5
+    screen_radii = np.maximum(np.trunc(radii[in_front[order]] * scales[order]), 1.5)
     
     # Draw bodies
-    for _, body, proj_x, proj_y, scale in body_renders:
-        # Special case for planetary body
-        if planetary_body and body == planetary_body:
+    for i, x, y, radius in zip(in_front[order].tolist(), proj_x[order].tolist(), proj_y[order].tolist(), screen_radii.tolist()):
+        pygame.draw.circle(screen, bodies[i].color, (x, y), radius)
+    
+    # Special case for planetary body, rendered last (on top) of everything else
+    if planetary_body:
+        # CRITICAL FIX: Check if planetary body is behind the camera with 60° leeway
+        # Calculate if planet center is behind the camera
+        relative_pos = planetary_body.position - camera.position
+        # Only the sign of the dot product is used, so relative_pos needn't be normalized
+        dot_product = np.dot(relative_pos, camera.get_forward_vector())
+        
+        # Only render if planet is in front of camera (dot_product >= 0)
+        # Skip rendering if planet is more than 45° behind camera
+        if dot_product >= 0:
             # Always render planetary body with partial visibility support
-            # Get projection scale first
-            _, _, _, proj_scale = project_3d_to_2d(body.position, camera, width, height)
+            # Projected in full precision: the camera sits just above its surface
+            center_proj_x, center_proj_y, _, proj_scale = project_3d_to_2d(planetary_body.position, camera, width, height)
             
+            # A failed projection returns None for every field
             if proj_scale is not None:
                 # Calculate screen space radius
-                screen_radius = max(1.5, int(body.radius * proj_scale))
-                
-                # Draw the filled circle if center is on screen
-                center_proj_x, center_proj_y, center_cam_z, center_scale = project_3d_to_2d(body.position, camera, width, height)
-                if center_proj_x is not None and center_proj_y is not None and center_cam_z is not None and center_scale is not None:
-                    pygame.draw.circle(screen, body.color, (int(center_proj_x), int(center_proj_y)), screen_radius)
-            # Skip normal rendering
-            continue
-            
-        # Skip if projection is invalid or off-screen
-        if not (isinstance(proj_x, (int, float)) and isinstance(proj_y, (int, float))):
-            continue
-        if proj_x < -100 or proj_x > width + 100 or proj_y < -100 or proj_y > height + 100:
-            continue
-        
-        radius = max(1.5, int(body.radius * scale))
-        pygame.draw.circle(screen, body.color, (int(proj_x), int(proj_y)), radius)
+                screen_radius = max(1.5, int(planetary_body.radius * proj_scale))
+                pygame.draw.circle(screen, planetary_body.color, (int(center_proj_x), int(center_proj_y)), screen_radius)
+    
+    return in_front, proj_x, proj_y, scales, projected
 
 
 def draw_ui(screen, camera, show_trails, show_ui, time_multiplier, movement_speed_multiplier, width, height, locked_body=None, planetary_body=None):
     """Draw user interface elements"""
-    font = pygame.font.Font(None, 24)
+    if not _instruction_surfaces:
+        font = get_font(24)
+        _instruction_surfaces.extend(font.render(text, True, WHITE) for text in UI_INSTRUCTIONS)
     
     # Get rotation angles from vectors
     yaw_deg, pitch_deg, roll_deg = camera.get_angles_for_display()
-    yaw_deg = np.degrees(yaw_deg) % 360
-    pitch_deg = np.degrees(pitch_deg) % 360
-    roll_deg = np.degrees(roll_deg) % 360
+    yaw_deg = math.degrees(yaw_deg) % 360
+    pitch_deg = math.degrees(pitch_deg) % 360
+    roll_deg = math.degrees(roll_deg) % 360
     
     # Get planetary manual rotation info if in planetary mode
     planetary_rotation_info = ""
-    if planetary_body and hasattr(camera, 'manual_rotation'):
+    if planetary_body:
         # Extract angles from manual rotation matrix for display
         try:
             # Convert rotation matrix to Euler angles for display
-            manual_yaw = np.arctan2(camera.manual_rotation[1, 0], camera.manual_rotation[0, 0])
-            manual_pitch = np.arcsin(-camera.manual_rotation[2, 0])
-            manual_roll = np.arctan2(camera.manual_rotation[2, 1], camera.manual_rotation[2, 2])
+            # Scalar math on plain floats; ufuncs cost more in dispatch than in arithmetic here
+            m = camera.manual_rotation.tolist()
+            manual_yaw = math.atan2(m[1][0], m[0][0])
+            manual_pitch = math.asin(max(-1.0, min(1.0, -m[2][0])))  # Rounding can push |m| just past 1
+            manual_roll = math.atan2(m[2][1], m[2][2])
             
-            manual_yaw_deg = np.degrees(manual_yaw) % 360
-            manual_pitch_deg = np.degrees(manual_pitch) % 360
-            manual_roll_deg = np.degrees(manual_roll) % 360
+            manual_yaw_deg = math.degrees(manual_yaw) % 360
+            manual_pitch_deg = math.degrees(manual_pitch) % 360
+            manual_roll_deg = math.degrees(manual_roll) % 360
             planetary_rotation_info = f"Manual: (Yaw: {manual_yaw_deg:.1f}°, Pitch: {manual_pitch_deg:.1f}°, Roll: {manual_roll_deg:.1f}°)"
         except:
             planetary_rotation_info = "Manual: (Vector-based rotation)"
@@ -207,60 +235,45 @@ def draw_ui(screen, camera, show_trails, show_ui, time_multiplier, movement_spee
         if latitude is not None:
             coord_info = f"Lat: {latitude:.2f}° | Lon: {longitude:.2f}° | Alt: {altitude/1e6:.1f}Mm"
     
-    # Build instructions list
-    instructions = [
-        "ESC: Exit | SPACE: Pause/Resume",
-        "T: Toggle Trails | R: Reset",
-        "+/-: Speed Up/Slow Down Time (0.01x - 100x)",
-        "./,: Faster/Slower Movement (0.1x - 10x)",
-        "Arrow Keys: Rotate View",
-        "WASD: Move Camera (relative to view)",
-        "Q/E: Move Forward/Backward",
-        "L: Lock to hovered planet",
-        "P: Planetary mode (fixed distance)",
+    # Build instructions list (static help lines are pre-rendered, the rest come from the text cache)
+    instructions = [render_text(text, 24) for text in (
         f"Trails: {'ON' if show_trails else 'OFF'}",
         f"Time: {time_multiplier:.2f}x",
         f"Move Speed: {movement_speed_multiplier:.2f}x",
         f"Position: ({camera.position[0]/1e11:.1f}, {camera.position[1]/1e11:.1f}, {camera.position[2]/1e11:.1f}) x10¹¹m",
         f"Rotation: (Pitch: {pitch_deg:.1f}°, Yaw: {yaw_deg:.1f}°, Roll: {roll_deg:.1f}°)"
-    ]
+    )]
+    instructions[:0] = _instruction_surfaces
     
     # Add planetary coordinates if available
     if coord_info:
-        instructions.insert(-2, f"Planetary: {coord_info}")
+        instructions.insert(-2, render_text(f"Planetary: {coord_info}", 24))
     
     # Add planetary manual rotation if available
     if planetary_rotation_info:
-        instructions.insert(-2, planetary_rotation_info)
+        instructions.insert(-2, render_text(planetary_rotation_info, 24))
     
     # Add mode information
     if locked_body:
-        instructions.append(f"LOCKED to: {locked_body.name}")
+        instructions.append(render_text(f"LOCKED to: {locked_body.name}", 24))
     elif planetary_body:
-        instructions.append(f"PLANETARY mode: {planetary_body.name}")
+        instructions.append(render_text(f"PLANETARY mode: {planetary_body.name}", 24))
     
     # Add planetary mode status if in planetary mode
     if planetary_body:
         planetary_info = f"PLANETARY: {planetary_body.name} (Press P to exit)"
-        instructions.insert(9, planetary_info)
+        instructions.insert(9, render_text(planetary_info, 24))
     
-    for i, text in enumerate(instructions):
-        surface = font.render(text, True, WHITE)
-        screen.blit(surface, (10, 10 + i * 25))
+    screen.blits([(surface, (10, 10 + i * 25)) for i, surface in enumerate(instructions)], doreturn=False)
 
 
 def draw_hover_info(screen, body, camera, width, height):
     """Draw hover information for a celestial body"""
-    font = pygame.font.Font(None, 20)
-    
     # Get body position and project to screen
     proj_x, proj_y, cam_z, scale = project_3d_to_2d(body.position, camera, width, height)
     
-    # Skip if projection failed
-    if proj_x is None or proj_y is None or cam_z is None or scale is None:
-        return
-    
-    if not (isinstance(proj_x, (int, float)) and isinstance(proj_y, (int, float))):
+    # Skip if projection failed (project_3d_to_2d returns None for every field then)
+    if proj_x is None:
         return
     
     # Calculate screen radius for halo
@@ -283,7 +296,7 @@ def draw_hover_info(screen, body, camera, width, height):
     max_text_width = 0
     
     for i, line in enumerate(info_lines):
-        surface = font.render(line, True, WHITE)
+        surface = render_text(line, 20)
         text_surfaces.append(surface)
         max_text_width = max(max_text_width, surface.get_width())
     
@@ -303,5 +316,4 @@ def draw_hover_info(screen, body, camera, width, height):
     pygame.draw.rect(screen, WHITE, bg_rect, 1)
     
     # Draw text
-    for i, surface in enumerate(text_surfaces):
-        screen.blit(surface, (text_x, text_y + i * 22))
+    screen.blits([(surface, (text_x, text_y + i * 22)) for i, surface in enumerate(text_surfaces)], doreturn=False)